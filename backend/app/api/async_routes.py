@@ -0,0 +1,150 @@
+# backend/app/api/async_routes.py
+"""
+Async variants of the read endpoints, served when USE_ASYNC_DB is enabled.
+
+They share paths and responses with `routes.py`. The services are reused
+unchanged through `AsyncSession.run_sync`, which runs their sync ORM code on
+the async connection inside the event loop, so a request waiting on the
+database holds no thread.
+"""
+from datetime import date
+from typing import Any, Dict, Literal, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_database import get_async_db
+from app.db.models import User
+from app.api.responses import FastJSONResponse
+from app.services.transaction_service import TransactionService
+from app.services.analytics_service import AnalyticsService
+from app.dependencies import dataset_etag_async, get_current_user_async, transaction_filters
+
+router = APIRouter()
+
+Granularity = Literal["day", "week", "month"]
+
+
+async def _list_transactions(db: AsyncSession, method: str, *args):
+    try:
+        return await db.run_sync(lambda session: getattr(TransactionService(session), method)(*args))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+async def _analytics(db: AsyncSession, method: str, *args):
+    try:
+        return await db.run_sync(lambda session: getattr(AnalyticsService(session), method)(*args))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.get("/unified_transactions", response_class=FastJSONResponse)
+async def get_unified_transactions(
+    db: AsyncSession = Depends(get_async_db),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Rows per page"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Include the total row count"),
+    filters: Dict[str, Any] = Depends(transaction_filters),
+    sort: str = Query("id", description="id, date or amount; prefix with - for descending"),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("unified"))
+):
+    """Get paginated unified transactions (authenticated users only)."""
+    result = await _list_transactions(db, "get_unified_transactions", page, page_size, after, include_total, filters, sort)
+    return FastJSONResponse(result, headers=cache_headers)
+
+@router.get("/unified_summary")
+async def unified_summary(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("unified"))
+):
+    """Get summary statistics for unified transactions (authenticated users only)."""
+    return await _analytics(db, "get_unified_summary")
+
+@router.get("/unified_pie_type")
+async def unified_pie_type(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("unified"))
+):
+    """Get transaction type counts for pie chart (authenticated users only)."""
+    return await _analytics(db, "get_pie_chart_data")
+
+@router.get("/unified_bar_source")
+async def unified_bar_source(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("unified"))
+):
+    """Get total amounts by source file for bar chart (authenticated users only)."""
+    return await _analytics(db, "get_bar_chart_data")
+
+@router.get("/unified_timeseries")
+async def unified_timeseries(
+    granularity: Granularity = Query("day", description="day, week (starting Monday) or month"),
+    date_from: Optional[date] = Query(None, description="Earliest transaction date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest transaction date (inclusive)"),
+    source_file: Optional[str] = Query(None, description="Exact source file name"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("unified"))
+):
+    """Get transaction counts and credit/debit totals per period (authenticated users only)."""
+    return await _analytics(db, "get_unified_time_series", granularity, date_from, date_to, source_file)
+
+@router.get("/org_transactions", response_class=FastJSONResponse)
+async def get_org_transactions(
+    db: AsyncSession = Depends(get_async_db),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Rows per page"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Include the total row count"),
+    filters: Dict[str, Any] = Depends(transaction_filters),
+    sort: str = Query("id", description="id, date or amount; prefix with - for descending"),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("org"))
+):
+    """Get paginated organization transactions (authenticated users only)."""
+    result = await _list_transactions(db, "get_org_transactions", page, page_size, after, include_total, filters, sort)
+    return FastJSONResponse(result, headers=cache_headers)
+
+@router.get("/org_summary")
+async def org_summary(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("org"))
+):
+    """Get summary statistics for organization transactions (authenticated users only)."""
+    return await _analytics(db, "get_org_summary")
+
+@router.get("/org_pie_type")
+async def org_pie_type(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("org"))
+):
+    """Get organization transaction type counts for pie chart (authenticated users only)."""
+    return await _analytics(db, "get_org_pie_chart_data")
+
+@router.get("/org_bar_source")
+async def org_bar_source(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("org"))
+):
+    """Get total amounts by source file for organization bar chart (authenticated users only)."""
+    return await _analytics(db, "get_org_bar_chart_data")
+
+@router.get("/org_timeseries")
+async def org_timeseries(
+    granularity: Granularity = Query("day", description="day, week (starting Monday) or month"),
+    date_from: Optional[date] = Query(None, description="Earliest transaction date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest transaction date (inclusive)"),
+    source_file: Optional[str] = Query(None, description="Exact source file name"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    cache_headers: Dict[str, str] = Depends(dataset_etag_async("org"))
+):
+    """Get organization transaction counts and credit/debit totals per period (authenticated users only)."""
+    return await _analytics(db, "get_org_time_series", granularity, date_from, date_to, source_file)
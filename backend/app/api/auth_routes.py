@@ -12,6 +12,7 @@ from app.services.auth_service import (
     get_user_by_email
 )
 from app.dependencies import get_current_user, get_current_superuser
+from app.services.user_cache import user_cache
 from app.db.models import User
 import secrets
 
@@ -147,7 +148,14 @@ def delete_user_endpoint(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    email = user.email
     db.delete(user)
     db.commit()
+    user_cache.invalidate(email)
     return {"message": "User deleted successfully"}
 
+@router.get("/cache_stats", dependencies=[Depends(get_current_superuser)])
+def auth_cache_stats():
+    """Hit/miss counters of the authenticated-user cache (superuser only)."""
+    return user_cache.stats()
+
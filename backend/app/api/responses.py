@@ -0,0 +1,37 @@
+# backend/app/api/responses.py
+"""
+JSON response for large listing payloads.
+
+Routes return `FastJSONResponse(content)` directly instead of a dict, so
+FastAPI's `jsonable_encoder` pass over every value is skipped and the body is
+rendered once, by orjson when it is installed. Content must already be plain
+JSON types (dicts, lists, str, numbers, bools, None, dates).
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            # Non-str keys: CSV rows longer than their header keep surplus
+            # values under a None key, which the default encoder writes as "null"
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
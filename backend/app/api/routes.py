@@ -1,13 +1,22 @@
 # backend/app/api/routes.py
-from fastapi import APIRouter, UploadFile, File, Depends, Query
+import asyncio
+from datetime import date
+from fastapi import APIRouter, UploadFile, File, Depends, Query, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Literal, Optional
 from app.db.database import get_db
 from app.db.models import User
-from app.services.upload_service import UploadService
+from app.api.responses import FastJSONResponse
+from app.services.ingest_jobs import IngestJobService, spool_uploads
 from app.services.transaction_service import TransactionService
 from app.services.analytics_service import AnalyticsService
-from app.dependencies import get_current_user, get_current_superuser
+from app.services.export_service import ExportService
+from app.services.reconciliation_service import ReconciliationService
+from app.services.search_service import SearchService
+from app.services.upload_service import UPLOAD_PREVIEW_MAX
+from app.dependencies import dataset_etag, get_current_user, get_current_superuser, transaction_filters
 
 router = APIRouter()
 
@@ -16,31 +25,111 @@ def root():
     return {"message": "FastAPI backend is working!"}
 
 
+DuplicatePolicy = Literal["flag", "skip", "keep"]
+UploadMode = Literal["replace", "append", "replace_source"]
+ExportFormat = Literal["csv", "ndjson"]
+Granularity = Literal["day", "week", "month"]
+
+async def _run_upload(dataset: str, files: List[UploadFile], background: bool, preview: int, db: Session, **options):
+    """
+    Spool the files and ingest them on the job pool. In background mode the
+    job id is returned immediately; otherwise the job is awaited without
+    blocking the event loop and its summary (with up to `preview` rows) is
+    returned. Either way the job id is the ingest id to page rows by.
+    """
+    spooled = await run_in_threadpool(spool_uploads, files)
+    job, future = IngestJobService(db).submit(dataset, spooled, preview=0 if background else preview, **options)
+    if background:
+        return {"job_id": job.id, "status": job.status}
+    return await asyncio.wrap_future(future)
+
+def _search(db: Session, dataset: str, q: str, page: int, page_size: int):
+    try:
+        return SearchService(db).search(dataset, q, page, page_size)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+def _time_series(db: Session, method: str, *args):
+    try:
+        return getattr(AnalyticsService(db), method)(*args)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+def _export(db: Session, dataset: str, fmt: str, gzip: bool, filters: Dict[str, Any], sort: str):
+    try:
+        chunks, media_type, filename = ExportService(db).export(dataset, fmt, filters, sort, gzip)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @router.post("/unified_upload")
 async def unified_upload(
     files: List[UploadFile] = File(...), 
+    background: bool = Query(False, description="Return a job id immediately instead of waiting"),
+    duplicates: DuplicatePolicy = Query("flag", description="flag, skip or keep rows already seen"),
+    mode: UploadMode = Query("replace", description="replace the dataset, append to it, or replace only the uploaded files' rows"),
+    preview: int = Query(20, ge=0, le=UPLOAD_PREVIEW_MAX, description="Ingested rows to include in the response"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_superuser)
 ):
     """Upload and process CSV and MT940 files for unified transaction storage (superuser only)."""
-    upload_service = UploadService(db)
-    return await upload_service.process_unified_upload(files)
+    return await _run_upload("unified", files, background, preview, db, duplicates=duplicates, mode=mode)
 
-@router.get("/unified_transactions")
+@router.get("/unified_transactions", response_class=FastJSONResponse)
 def get_unified_transactions(
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Rows per page"),
-    current_user: User = Depends(get_current_user)
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Include the total row count"),
+    filters: Dict[str, Any] = Depends(transaction_filters),
+    sort: str = Query("id", description="id, date or amount; prefix with - for descending"),
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("unified"))
 ):
     """Get paginated unified transactions (authenticated users only)."""
     transaction_service = TransactionService(db)
-    return transaction_service.get_unified_transactions(page, page_size)
+    try:
+        return FastJSONResponse(
+            transaction_service.get_unified_transactions(page, page_size, after, include_total, filters, sort),
+            headers=cache_headers,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+@router.get("/unified_export")
+def unified_export(
+    fmt: ExportFormat = Query("csv", alias="format", description="csv or ndjson"),
+    gzip: bool = Query(False, description="Gzip-compress the file"),
+    filters: Dict[str, Any] = Depends(transaction_filters),
+    sort: str = Query("id", description="id, date or amount; prefix with - for descending"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every unified transaction matching the filters as a file (authenticated users only)."""
+    return _export(db, "unified", fmt, gzip, filters, sort)
+
+@router.get("/unified_search")
+def unified_search(
+    q: str = Query(..., min_length=1, max_length=200, description="Payer name, invoice or narrative text"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Rows per page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("unified"))
+):
+    """Ranked search over unified transactions (authenticated users only)."""
+    return _search(db, "unified", q, page, page_size)
 
 @router.get("/unified_summary")
 def unified_summary(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("unified"))
 ):
     """Get summary statistics for unified transactions (authenticated users only)."""
     analytics_service = AnalyticsService(db)
@@ -49,7 +138,8 @@ def unified_summary(
 @router.get("/unified_pie_type")
 def unified_pie_type(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("unified"))
 ):
     """Get transaction type counts for pie chart (authenticated users only)."""
     analytics_service = AnalyticsService(db)
@@ -58,37 +148,90 @@ def unified_pie_type(
 @router.get("/unified_bar_source")
 def unified_bar_source(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("unified"))
 ):
     """Get total amounts by source file for bar chart (authenticated users only)."""
     analytics_service = AnalyticsService(db)
     return analytics_service.get_bar_chart_data()
 
+@router.get("/unified_timeseries")
+def unified_timeseries(
+    granularity: Granularity = Query("day", description="day, week (starting Monday) or month"),
+    date_from: Optional[date] = Query(None, description="Earliest transaction date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest transaction date (inclusive)"),
+    source_file: Optional[str] = Query(None, description="Exact source file name"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("unified"))
+):
+    """Get transaction counts and credit/debit totals per period (authenticated users only)."""
+    return _time_series(db, "get_unified_time_series", granularity, date_from, date_to, source_file)
+
 @router.post("/org_upload")
 async def org_upload(
     files: List[UploadFile] = File(...), 
+    background: bool = Query(False, description="Return a job id immediately instead of waiting"),
+    duplicates: DuplicatePolicy = Query("flag", description="flag, skip or keep rows already seen"),
+    mode: UploadMode = Query("replace", description="replace the dataset, append to it, or replace only the uploaded files' rows"),
+    preview: int = Query(20, ge=0, le=UPLOAD_PREVIEW_MAX, description="Ingested rows to include in the response"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_superuser)
 ):
     """Upload and process CSV files for organization transaction storage (superuser only)."""
-    upload_service = UploadService(db)
-    return await upload_service.process_org_upload(files)
+    return await _run_upload("org", files, background, preview, db, duplicates=duplicates, mode=mode)
 
-@router.get("/org_transactions")
+@router.get("/org_transactions", response_class=FastJSONResponse)
 def get_org_transactions(
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Rows per page"),
-    current_user: User = Depends(get_current_user)
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor; overrides page"),
+    include_total: bool = Query(True, description="Include the total row count"),
+    filters: Dict[str, Any] = Depends(transaction_filters),
+    sort: str = Query("id", description="id, date or amount; prefix with - for descending"),
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("org"))
 ):
     """Get paginated organization transactions (authenticated users only)."""
     transaction_service = TransactionService(db)
-    return transaction_service.get_org_transactions(page, page_size)
+    try:
+        return FastJSONResponse(
+            transaction_service.get_org_transactions(page, page_size, after, include_total, filters, sort),
+            headers=cache_headers,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+@router.get("/org_export")
+def org_export(
+    fmt: ExportFormat = Query("csv", alias="format", description="csv or ndjson"),
+    gzip: bool = Query(False, description="Gzip-compress the file"),
+    filters: Dict[str, Any] = Depends(transaction_filters),
+    sort: str = Query("id", description="id, date or amount; prefix with - for descending"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every organization transaction matching the filters as a file (authenticated users only)."""
+    return _export(db, "org", fmt, gzip, filters, sort)
+
+@router.get("/org_search")
+def org_search(
+    q: str = Query(..., min_length=1, max_length=200, description="Payer name, invoice or narrative text"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Rows per page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("org"))
+):
+    """Ranked search over organization transactions (authenticated users only)."""
+    return _search(db, "org", q, page, page_size)
 
 @router.get("/org_summary")
 def org_summary(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("org"))
 ):
     """Get summary statistics for organization transactions (authenticated users only)."""
     analytics_service = AnalyticsService(db)
@@ -97,7 +240,8 @@ def org_summary(
 @router.get("/org_pie_type")
 def org_pie_type(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("org"))
 ):
     """Get organization transaction type counts for pie chart (authenticated users only)."""
     analytics_service = AnalyticsService(db)
@@ -106,8 +250,112 @@ def org_pie_type(
 @router.get("/org_bar_source")
 def org_bar_source(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("org"))
 ):
     """Get total amounts by source file for organization bar chart (authenticated users only)."""
     analytics_service = AnalyticsService(db)
-    return analytics_service.get_org_bar_chart_data()
\ No newline at end of file
+    return analytics_service.get_org_bar_chart_data()
+
+@router.get("/org_timeseries")
+def org_timeseries(
+    granularity: Granularity = Query("day", description="day, week (starting Monday) or month"),
+    date_from: Optional[date] = Query(None, description="Earliest transaction date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest transaction date (inclusive)"),
+    source_file: Optional[str] = Query(None, description="Exact source file name"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cache_headers: Dict[str, str] = Depends(dataset_etag("org"))
+):
+    """Get organization transaction counts and credit/debit totals per period (authenticated users only)."""
+    return _time_series(db, "get_org_time_series", granularity, date_from, date_to, source_file)
+
+@router.get("/upload_jobs")
+def list_upload_jobs(
+    db: Session = Depends(get_db),
+    dataset: Optional[str] = Query(None, description="unified or org"),
+    limit: int = Query(20, ge=1, le=100, description="Most recent jobs to return"),
+    current_user: User = Depends(get_current_superuser)
+):
+    """List recent upload jobs (superuser only)."""
+    return IngestJobService(db).list_jobs(dataset, limit)
+
+@router.get("/upload_jobs/{job_id}")
+def get_upload_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get the state, progress and errors of an upload job (superuser only)."""
+    job = IngestJobService(db).get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+@router.get("/upload_jobs/{job_id}/rows", response_class=FastJSONResponse)
+def get_upload_job_rows(
+    job_id: str,
+    page_size: int = Query(100, ge=1, le=1000, description="Rows per page"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """Page through the rows an upload job wrote (superuser only)."""
+    try:
+        page = IngestJobService(db).get_rows(job_id, page_size, after)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if page is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return FastJSONResponse(page)
+
+@router.post("/reconciliation/run")
+def run_reconciliation(
+    amount_tolerance: float = Query(0.01, ge=0, description="Largest amount difference treated as equal"),
+    date_window_days: int = Query(3, ge=0, le=60, description="Largest date difference, in days, for amount matches"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """Match bank transactions against organization records and store the results (superuser only)."""
+    return ReconciliationService(db).run(amount_tolerance, date_window_days)
+
+@router.get("/reconciliation/runs")
+def list_reconciliation_runs(
+    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100, description="Most recent runs to return"),
+    current_user: User = Depends(get_current_user)
+):
+    """List recent reconciliation runs with their summary counts (authenticated users only)."""
+    return ReconciliationService(db).list_runs(limit)
+
+@router.get("/reconciliation/runs/{run_id}")
+def get_reconciliation_run(
+    run_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the parameters and summary counts of a reconciliation run (authenticated users only)."""
+    run = ReconciliationService(db).get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reconciliation run not found")
+    return run
+
+@router.get("/reconciliation/runs/{run_id}/results")
+def get_reconciliation_results(
+    run_id: str,
+    db: Session = Depends(get_db),
+    result_status: Optional[str] = Query(
+        None, alias="status", description="matched, ambiguous, unmatched_bank or unmatched_org"
+    ),
+    page_size: int = Query(50, ge=1, le=200, description="Results per page"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    current_user: User = Depends(get_current_user)
+):
+    """Page through a reconciliation run's results with both transactions (authenticated users only)."""
+    service = ReconciliationService(db)
+    if service.get_run(run_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reconciliation run not found")
+    try:
+        return service.get_results(run_id, result_status, page_size, after)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
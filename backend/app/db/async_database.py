@@ -0,0 +1,52 @@
+"""
+Optional asyncio data layer for read endpoints.
+
+Enabled with USE_ASYNC_DB=true. The async URL is derived from DATABASE_URL
+(asyncpg for PostgreSQL, aiosqlite for SQLite) unless ASYNC_DATABASE_URL is
+set. The engine is created on first use so the async drivers are only needed
+when the mode is turned on.
+"""
+import os
+from typing import AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.db.database import DATABASE_URL
+
+USE_ASYNC_DB = os.getenv("USE_ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """Map a sync database URL to its asyncio driver."""
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _engine, _session_factory
+    if _engine is None:
+        options = {"pool_pre_ping": True}
+        if ASYNC_DATABASE_URL.startswith("postgresql"):
+            options.update(
+                pool_size=int(os.getenv("ASYNC_POOL_SIZE", "20")),
+                max_overflow=int(os.getenv("ASYNC_MAX_OVERFLOW", "20")),
+            )
+        _engine = create_async_engine(ASYNC_DATABASE_URL, **options)
+        _session_factory = async_sessionmaker(_engine, expire_on_commit=False, autoflush=False)
+    return _engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _session_factory() as db:
+        yield db
@@ -0,0 +1,118 @@
+"""
+Batched writer for bulk transaction ingest.
+
+Rows are buffered as plain dicts and written in batches, bypassing the ORM
+unit of work. PostgreSQL connections through psycopg2 use `COPY FROM STDIN`;
+every other engine (e.g. SQLite for local runs) falls back to a Core
+`insert()` executed with executemany.
+"""
+
+import io
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.types import JSON as SAJSON
+
+logger = logging.getLogger(__name__)
+
+
+def _copy_field(value: Any) -> str:
+    """
+    Encode one value for COPY's CSV format. Strings are always quoted so an
+    empty string survives, while None becomes an unquoted empty field (NULL).
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+class BulkWriter:
+    """Buffers row dicts for one table and writes them in batches."""
+
+    def __init__(self, db: Session, model, batch_size: int = 5000, use_copy: Optional[bool] = None):
+        self.db = db
+        self.table = model.__table__
+        self.batch_size = batch_size
+        self.use_copy = self._supports_copy() if use_copy is None else use_copy
+        self.json_columns = {c.name for c in self.table.columns if isinstance(c.type, SAJSON)}
+        self.buffer: List[Dict[str, Any]] = []
+        self.rows_written = 0
+        self.batch_timings: List[Dict[str, Any]] = []
+
+    def _supports_copy(self) -> bool:
+        dialect = self.db.get_bind().dialect
+        return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Queue a row; writes a batch once `batch_size` rows are pending."""
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Queue a chunk of rows, e.g. a normalized DataFrame chunk."""
+        self.buffer.extend(rows)
+        while len(self.buffer) >= self.batch_size:
+            pending = self.buffer[self.batch_size:]
+            self.buffer = self.buffer[:self.batch_size]
+            self.flush()
+            self.buffer = pending
+
+    def flush(self) -> None:
+        """Write all pending rows in the session's current transaction."""
+        if not self.buffer:
+            return
+        rows = self.buffer
+        self.buffer = []
+
+        start = time.perf_counter()
+        if self.use_copy:
+            self._copy_rows(rows)
+        else:
+            self.db.execute(insert(self.table), rows)
+        elapsed = time.perf_counter() - start
+
+        self.rows_written += len(rows)
+        self.batch_timings.append({
+            "rows": len(rows),
+            "seconds": round(elapsed, 6),
+            "method": "copy" if self.use_copy else "executemany",
+        })
+        logger.debug("bulk wrote %d rows to %s in %.3fs", len(rows), self.table.name, elapsed)
+
+    def _copy_rows(self, rows: List[Dict[str, Any]]) -> None:
+        columns = list(rows[0].keys())
+        json_flags = [col in self.json_columns for col in columns]
+        buf = io.StringIO()
+        for row in rows:
+            fields = []
+            for col, is_json in zip(columns, json_flags):
+                value = row.get(col)
+                fields.append(_copy_field(json.dumps(value) if is_json else value))
+            buf.write(",".join(fields))
+            buf.write("\n")
+        buf.seek(0)
+
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        sql = f'COPY "{self.table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+        dbapi_conn = self.db.connection().connection.dbapi_connection
+        with dbapi_conn.cursor() as cursor:
+            cursor.copy_expert(sql, buf)
+
+    def stats(self) -> Dict[str, Any]:
+        """Rows written plus per-batch timings, for upload responses and benchmarks."""
+        total = sum(t["seconds"] for t in self.batch_timings)
+        return {
+            "rows_written": self.rows_written,
+            "write_seconds": round(total, 6),
+            "batches": self.batch_timings,
+        }
@@ -0,0 +1,175 @@
+"""
+Lightweight schema upgrades on top of `Base.metadata.create_all`.
+
+`create_all` only creates missing tables. `upgrade_schema` additionally adds
+model columns and indexes that are missing from existing tables, so new
+nullable columns can ship without a migration framework. On PostgreSQL it
+also converts JSON columns the models declare as JSONB and creates the GIN
+(JSONB, full-text, trigram) indexes; on SQLite it creates the FTS5 search
+tables. Data backfills for new columns live here too and run in batches.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db import models  # noqa: F401  (registers the tables on Base)
+from app.db.database import Base
+from app.parsers.csv_normalizer import promoted_values, search_text
+from app.parsers.dates import parse_date, parse_timestamp, row_time
+from app.services.dedupe import row_fingerprint
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_TABLES = ("unified_transactions", "user_transactions")
+
+# Expression indexed for full-text search on PostgreSQL; queries must use it verbatim
+SEARCH_TSVECTOR = "to_tsvector('simple', search_text)"
+
+# PostgreSQL-only indexes: name -> (table, USING clause). The trigram index
+# is created only when the pg_trgm extension is available.
+POSTGRES_INDEXES = {}
+for _table in TRANSACTION_TABLES:
+    POSTGRES_INDEXES[f"ix_{_table}_data_gin"] = (_table, "gin (data)")
+    POSTGRES_INDEXES[f"ix_{_table}_search_tsv"] = (_table, f"gin ({SEARCH_TSVECTOR})")
+    POSTGRES_INDEXES[f"ix_{_table}_search_trgm"] = (_table, "gin (search_text gin_trgm_ops)")
+
+
+def has_pg_trgm(conn) -> bool:
+    return conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+def _ensure_pg_trgm(engine: Engine) -> bool:
+    """Create the pg_trgm extension if allowed; fuzzy search is skipped without it."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        return True
+    except Exception as exc:
+        logger.warning("pg_trgm unavailable, fuzzy search disabled: %s", exc)
+        with engine.connect() as conn:
+            return has_pg_trgm(conn)
+
+
+def _ensure_sqlite_fts(conn, table: str) -> bool:
+    """
+    Create an FTS5 index over `search_text`, kept in sync by triggers, and
+    fill it from existing rows. Returns True if it was created.
+    """
+    fts = f"{table}_fts"
+    if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": fts}).first():
+        return False
+    statements = [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(search_text, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF search_text ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {fts}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+    try:
+        with conn.begin_nested():
+            for statement in statements:
+                conn.execute(text(statement))
+    except Exception as exc:
+        logger.warning("FTS5 unavailable, search falls back to LIKE: %s", exc)
+        return False
+    return True
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    Add missing columns (always nullable) and indexes to existing tables.
+    Returns a description of each change applied.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    postgres = engine.dialect.name == "postgresql"
+    trigram = postgres and _ensure_pg_trgm(engine)
+    applied = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"]: c for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                ddl = column.type.compile(dialect=engine.dialect)
+                if column.name not in existing:
+                    conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {ddl}"))
+                    applied.append(f"add column {table.name}.{column.name}")
+                elif postgres and ddl == "JSONB":
+                    current = existing[column.name]["type"].compile(dialect=engine.dialect)
+                    if current == "JSON":
+                        name = quote(column.name)
+                        conn.execute(text(
+                            f"ALTER TABLE {quote(table.name)} ALTER COLUMN {name} TYPE JSONB USING {name}::jsonb"
+                        ))
+                        applied.append(f"convert {table.name}.{column.name} to JSONB")
+
+            indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+                    applied.append(f"create index {index.name}")
+
+            if table.name not in TRANSACTION_TABLES:
+                continue
+            if postgres:
+                for name, (table_name, using) in POSTGRES_INDEXES.items():
+                    if table_name != table.name or name in indexes:
+                        continue
+                    if "gin_trgm_ops" in using and not trigram:
+                        continue
+                    conn.execute(text(f"CREATE INDEX {quote(name)} ON {quote(table_name)} USING {using}"))
+                    applied.append(f"create index {name}")
+            elif engine.dialect.name == "sqlite" and _ensure_sqlite_fts(conn, table.name):
+                applied.append(f"create full-text index {table.name}_fts")
+    for change in applied:
+        logger.info("schema upgrade: %s", change)
+    return applied
+
+
+def backfill_transaction_columns(db: Session, model, batch_size: int = 5000) -> int:
+    """
+    Recompute the columns derived at ingest (typed dates, search text,
+    promoted `data` fields and fingerprints) for rows written before those
+    columns existed. Walks the table in id order, one committed batch at a
+    time, so it can be interrupted and rerun. Returns the number of rows
+    updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(model.id, model.date, model.amount, model.description, model.data)
+            .filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return updated
+        last_id = rows[-1][0]
+
+        mappings = []
+        for txn_id, date_value, amount, description, data in rows:
+            mapping = {
+                "id": txn_id,
+                "txn_date": parse_date(date_value),
+                "txn_timestamp": parse_timestamp(date_value, row_time(data)),
+                "search_text": search_text(description, data),
+                **promoted_values(data),
+            }
+            mapping["fingerprint"] = row_fingerprint(
+                {**mapping, "date": date_value, "amount": amount, "description": description}, data
+            )
+            mappings.append(mapping)
+        db.bulk_update_mappings(model, mappings)
+        db.commit()
+        updated += len(mappings)
@@ -1,28 +1,76 @@
 # backend/app/db/models.py
-from sqlalchemy import Column, Integer, Float, String, Boolean
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, Integer, Float, String, Boolean, Date, DateTime, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import JSON as SAJSON
 from app.db.database import Base
 
 
 class UnifiedTransaction(Base):
     __tablename__ = "unified_transactions"
+    __table_args__ = (
+        # Date range filters and date-ordered keyset pagination
+        Index("ix_unified_transactions_txn_date_id", "txn_date", "id"),
+        # Type / source file lookups, alone or with a date range
+        Index("ix_unified_transactions_type_txn_date", "type", "txn_date", "id"),
+        Index("ix_unified_transactions_source_file_txn_date", "source_file", "txn_date", "id"),
+        # Amount range filters and amount-ordered pages
+        Index("ix_unified_transactions_amount_id", "amount", "id"),
+        # Rows of one upload, paged by id
+        Index("ix_unified_transactions_ingest_id_id", "ingest_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     date = Column(String)
     amount = Column(Float)
     description = Column(String)
     type = Column(String)  # credit/debit/fee/etc.
     source_file = Column(String)  # Optional: filename or batch id
-    data = Column(SAJSON)  # Store extra/dynamic fields
+    data = Column(SAJSON().with_variant(JSONB(), "postgresql"))  # Store extra/dynamic fields
+    txn_date = Column(Date)  # `date` parsed at ingest; NULL if unrecognized
+    txn_timestamp = Column(DateTime)  # txn_date plus the transaction time, when known
+    search_text = Column(String)  # description, payer and reference fields (see search_service)
+    fingerprint = Column(String, index=True)  # content hash for duplicate detection (see dedupe)
+    is_duplicate = Column(Boolean)  # True when flagged as a duplicate at ingest, else NULL
+    ingest_id = Column(String)  # upload job that wrote the row; NULL for edits and older rows
+    # Copies of hot `data` fields, for indexed lookups (see PROMOTED_FIELDS)
+    student_id = Column(String, index=True)
+    invoice_number = Column(String, index=True)
+    transaction_id = Column(String, index=True)
+    payer_email = Column(String, index=True)
+    academic_session = Column(String, index=True)
 
 class UserTransaction(Base):
     __tablename__ = "user_transactions"
+    __table_args__ = (
+        # Date range filters and date-ordered keyset pagination
+        Index("ix_user_transactions_txn_date_id", "txn_date", "id"),
+        # Type / source file lookups, alone or with a date range
+        Index("ix_user_transactions_type_txn_date", "type", "txn_date", "id"),
+        Index("ix_user_transactions_source_file_txn_date", "source_file", "txn_date", "id"),
+        # Amount range filters and amount-ordered pages
+        Index("ix_user_transactions_amount_id", "amount", "id"),
+        # Rows of one upload, paged by id
+        Index("ix_user_transactions_ingest_id_id", "ingest_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     date = Column(String)
     amount = Column(Float)
     description = Column(String)
     type = Column(String)  # credit/debit/fee/etc.
     source_file = Column(String)  # Optional: filename or batch id
-    data = Column(SAJSON)  # Store extra/dynamic fields
+    data = Column(SAJSON().with_variant(JSONB(), "postgresql"))  # Store extra/dynamic fields
+    txn_date = Column(Date)  # `date` parsed at ingest; NULL if unrecognized
+    txn_timestamp = Column(DateTime)  # txn_date plus the transaction time, when known
+    search_text = Column(String)  # description, payer and reference fields (see search_service)
+    fingerprint = Column(String, index=True)  # content hash for duplicate detection (see dedupe)
+    is_duplicate = Column(Boolean)  # True when flagged as a duplicate at ingest, else NULL
+    ingest_id = Column(String)  # upload job that wrote the row; NULL for edits and older rows
+    # Copies of hot `data` fields, for indexed lookups (see PROMOTED_FIELDS)
+    student_id = Column(String, index=True)
+    invoice_number = Column(String, index=True)
+    transaction_id = Column(String, index=True)
+    payer_email = Column(String, index=True)
+    academic_session = Column(String, index=True)
 
 class User(Base):
     __tablename__ = "users"
@@ -30,4 +78,97 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_superuser = Column(Boolean, default=False)
-    is_active = Column(Boolean, default=True)
\ No newline at end of file
+    is_active = Column(Boolean, default=True)
+
+class TransactionRollup(Base):
+    """Per-(dataset, type, source_file) aggregates maintained at write time."""
+    __tablename__ = "transaction_rollups"
+    __table_args__ = (
+        UniqueConstraint("dataset", "type", "source_file", name="uq_transaction_rollup_group"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    dataset = Column(String, nullable=False)  # unified/org
+    type = Column(String, nullable=False, default="")  # NULL types are stored as ""
+    source_file = Column(String, nullable=False, default="")
+    txn_count = Column(Integer, nullable=False, default=0)
+    amount_count = Column(Integer, nullable=False, default=0)  # rows with a non-null amount
+    amount_sum = Column(Float, nullable=False, default=0.0)
+    amount_min = Column(Float)
+    amount_max = Column(Float)
+
+class DailyRollup(Base):
+    """Per-(dataset, day, type, source_file) counts and sums maintained at write time."""
+    __tablename__ = "transaction_daily_rollups"
+    __table_args__ = (
+        # Also serves date range scans of one dataset
+        UniqueConstraint("dataset", "day", "type", "source_file", name="uq_transaction_daily_rollup_group"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    dataset = Column(String, nullable=False)  # unified/org
+    day = Column(Date, nullable=False)  # txn_date; rows without one are not counted
+    type = Column(String, nullable=False, default="")  # NULL types are stored as ""
+    source_file = Column(String, nullable=False, default="")
+    txn_count = Column(Integer, nullable=False, default=0)
+    amount_count = Column(Integer, nullable=False, default=0)  # rows with a non-null amount
+    amount_sum = Column(Float, nullable=False, default=0.0)
+
+class DatasetVersion(Base):
+    """Per-dataset data version, bumped in every transaction that changes the dataset."""
+    __tablename__ = "dataset_versions"
+    dataset = Column(String, primary_key=True)  # unified/org
+    version = Column(BigInteger, nullable=False)  # starts at a millisecond timestamp, then +1
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+    id = Column(String, primary_key=True)  # uuid4 hex
+    dataset = Column(String, nullable=False, index=True)  # unified/org
+    status = Column(String, nullable=False, default="queued")  # queued/running/succeeded/failed
+    files = Column(SAJSON)  # uploaded filenames, in order
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_per_sec = Column(Float, nullable=False, default=0.0)
+    error = Column(String)
+    result = Column(SAJSON)  # upload summary (without the row echo)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class ReconciliationRun(Base):
+    __tablename__ = "reconciliation_runs"
+    id = Column(String, primary_key=True)  # uuid4 hex
+    status = Column(String, nullable=False, default="running")  # running/succeeded/failed
+    params = Column(SAJSON)  # amount_tolerance, date_window_days
+    summary = Column(SAJSON)  # counts per status and match method
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class ReconciliationResult(Base):
+    """One bank/org pairing, or one unmatched row, of a reconciliation run."""
+    __tablename__ = "reconciliation_results"
+    __table_args__ = (
+        # Paging a run's results, optionally by status
+        Index("ix_reconciliation_results_run_status_id", "run_id", "status", "id"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # matched/ambiguous/unmatched_bank/unmatched_org
+    method = Column(String)  # reference/amount_date for paired rows
+    bank_id = Column(Integer)  # unified_transactions.id
+    org_id = Column(Integer)  # user_transactions.id
+    amount_diff = Column(Float)  # bank amount - org amount
+    day_diff = Column(Integer)  # bank date - org date, in days
+    candidates = Column(SAJSON)  # for ambiguous pairs: org ids that matched equally well
+
+class UploadedFile(Base):
+    """Content fingerprint of each file ingested into a dataset."""
+    __tablename__ = "uploaded_files"
+    __table_args__ = (
+        Index("ix_uploaded_files_dataset_sha256", "dataset", "sha256"),
+        Index("ix_uploaded_files_dataset_filename", "dataset", "filename"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    dataset = Column(String, nullable=False)  # unified/org
+    filename = Column(String, nullable=False)  # also the rows' source_file
+    sha256 = Column(String, nullable=False)
+    size = Column(Integer)  # bytes
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
@@ -1,17 +1,21 @@
-from fastapi import Depends, HTTPException, status
+from datetime import date
+from typing import Any, Dict, Optional
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.db.async_database import get_async_db
 from app.db.database import get_db
 from app.db.models import User
 from app.services.auth_service import verify_token
+from app.services.data_version import DataVersionService
+from app.services.user_cache import user_cache
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
+def _token_email(credentials: HTTPAuthorizationCredentials) -> str:
+    """Decode the bearer token and return its subject (the user's email)."""
     token = credentials.credentials
     payload = verify_token(token)
     if payload is None:
@@ -26,7 +30,10 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
-    user = db.query(User).filter(User.email == email).first()
+    return email
+
+def _check_user(user: Optional[User]) -> User:
+    """Reject unknown and inactive users."""
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,6 +46,33 @@ def get_current_user(
         )
     return user
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current authenticated user."""
+    email = _token_email(credentials)
+    user, generation = user_cache.get(email)
+    if user is None:
+        user = db.query(User).filter(User.email == email).first()
+        if user is not None:
+            user_cache.put(user, generation)
+    return _check_user(user)
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get the current authenticated user through the async data layer."""
+    email = _token_email(credentials)
+    user, generation = user_cache.get(email)
+    if user is None:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+        if user is not None:
+            user_cache.put(user, generation)
+    return _check_user(user)
+
 def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
     """Get the current user and verify they are a superuser."""
     if not current_user.is_superuser:
@@ -48,3 +82,66 @@ def get_current_superuser(current_user: User = Depends(get_current_user)) -> Use
         )
     return current_user
 
+
+def transaction_filters(
+    date_from: Optional[date] = Query(None, description="Earliest transaction date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest transaction date (inclusive)"),
+    type: Optional[str] = Query(None, description="Exact transaction type"),
+    source_file: Optional[str] = Query(None, description="Exact source file name"),
+    amount_min: Optional[float] = Query(None, description="Minimum amount (inclusive)"),
+    amount_max: Optional[float] = Query(None, description="Maximum amount (inclusive)"),
+    student_id: Optional[str] = Query(None, description="Exact student ID / roll number"),
+    invoice_number: Optional[str] = Query(None, description="Exact invoice / challan number"),
+) -> Dict[str, Any]:
+    """Filter query parameters shared by the transaction listing endpoints."""
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "type": type,
+        "source_file": source_file,
+        "amount_min": amount_min,
+        "amount_max": amount_max,
+        "student_id": student_id,
+        "invoice_number": invoice_number,
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match uses (a proxy may have marked it W/)."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _check_etag(request: Request, response: Response, dataset: str, version: int) -> Dict[str, str]:
+    etag = f'"{dataset}-{version}"'
+    # Cached copies must be revalidated, and only by this user's browser
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return headers
+
+
+def dataset_etag(dataset: str):
+    """
+    Dependency for GET endpoints whose response depends only on one
+    dataset's rows and the request. Looks up the dataset's data version and
+    answers 304 when If-None-Match already holds it, before the endpoint
+    runs; otherwise sets the ETag and returns the headers, for endpoints
+    that build their own Response.
+    """
+    def check(request: Request, response: Response, db: Session = Depends(get_db)) -> Dict[str, str]:
+        return _check_etag(request, response, dataset, DataVersionService(db).get(dataset))
+    return check
+
+
+def dataset_etag_async(dataset: str):
+    """Async-session variant of `dataset_etag`."""
+    async def check(
+        request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+    ) -> Dict[str, str]:
+        version = await db.run_sync(lambda session: DataVersionService(session).get(dataset))
+        return _check_etag(request, response, dataset, version)
+    return check
@@ -2,7 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router as api_router
 from app.api.auth_routes import router as auth_router
-from app.db.database import Base, engine
+from app.api.async_routes import router as async_api_router
+from app.db.async_database import USE_ASYNC_DB
+from app.db.database import Base, engine, SessionLocal
+from app.db.migrations import upgrade_schema
+from app.services.ingest_jobs import recover_interrupted_jobs
+from app.services.rollup_service import RollupService
 
 app = FastAPI()
 
@@ -15,7 +20,22 @@ app.add_middleware(
 )
 
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
+if USE_ASYNC_DB:
+    # Registered first, so these async read endpoints take precedence over
+    # the sync ones at the same paths
+    app.include_router(async_api_router)
 app.include_router(api_router)
 
 # uvicorn app.main:app --reload
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+# Add columns and indexes that create_all does not add to existing tables;
+# existing rows get the derived columns from `python backfill_columns.py`
+upgrade_schema(engine)
+
+# Build analytics rollups for data loaded before the rollup table existed
+with SessionLocal() as _db:
+    RollupService(_db).ensure_built()
+
+# Fail upload jobs a previous process left unfinished, and drop their spool files
+with SessionLocal() as _db:
+    recover_interrupted_jobs(_db)
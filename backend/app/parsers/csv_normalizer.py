@@ -4,9 +4,13 @@ CSV normalization utilities for the unified ingestion flow.
 This module exposes `normalize_csv_row`, which maps heterogeneous CSV headers
 into a consistent unified schema expected by the backend. It mirrors the
 approach used for MT940 parsing in `mt940_parser.py`.
+
+For bulk ingest, `compile_header_plan` resolves the header aliases once per
+file and returns a `HeaderPlan` that normalizes raw `csv.reader` rows with
+the same results.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
 
 HEADER_MAP: Dict[str, list[str]] = {
     "date": ["date", "value_date", "Date", "Transaction Date"],
@@ -33,6 +37,86 @@ HEADER_MAP: Dict[str, list[str]] = {
     "payment_status": ["Payment Status"],
 }
 
+DEFAULT_ROW: Dict[str, Any] = {
+    "date": "",
+    "amount": 0.0,
+    "description": "",
+    "type": "",
+    "transaction_time": "",
+    "currency": "",
+    "transaction_id": "",
+    "university_bank_name": "",
+    "university_account_number": "",
+    "payer_name": "",
+    "student_id": "",
+    "payer_email": "",
+    "academic_session": "",
+    "invoice_number": "",
+    "payment_status": "",
+}
+
+
+def parse_amount(value: Any) -> float:
+    """Parse an amount cell, ignoring thousands separators; bad values become 0.0."""
+    try:
+        return float(str(value).replace(",", "").replace(" ", ""))
+    except Exception:
+        return 0.0
+
+
+# Fields also stored in their own indexed columns for direct lookups
+PROMOTED_FIELDS: Tuple[str, ...] = (
+    "student_id",
+    "invoice_number",
+    "transaction_id",
+    "payer_email",
+    "academic_session",
+)
+
+
+def promoted_values(row: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """
+    Values for the promoted columns, read from a normalized row or from a
+    `data` dict keyed by the original CSV headers. Empty values become None.
+    """
+    values: Dict[str, Optional[str]] = {}
+    for key in PROMOTED_FIELDS:
+        value = None
+        if row:
+            value = row.get(key)
+            if not value:
+                value = next((row[a] for a in HEADER_MAP[key] if row.get(a)), None)
+        values[key] = str(value) if value not in (None, "") else None
+    return values
+
+
+# Fields joined into `search_text`, after the description. MT940 references
+# come from `data`; the rest are resolved through HEADER_MAP aliases.
+SEARCH_FIELDS: Tuple[str, ...] = (
+    "payer_name",
+    "invoice_number",
+    "transaction_id",
+    "student_id",
+    "customer_reference",
+    "bank_reference",
+)
+
+
+def search_text(description: Any, *sources: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Text indexed for search: the description plus payer name, invoice and
+    reference fields found in the given normalized rows or `data` dicts.
+    """
+    parts = [str(description)] if description else []
+    for key in SEARCH_FIELDS:
+        aliases = (key, *HEADER_MAP.get(key, ()))
+        for source in sources:
+            value = next((source[a] for a in aliases if source and source.get(a)), None)
+            if value:
+                parts.append(str(value))
+                break
+    return " ".join(parts) if parts else None
+
 
 def normalize_csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -41,34 +125,13 @@ def normalize_csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
     Unknown/extra fields are not included here; callers can merge them into
     a separate `data` JSON column as needed.
     """
-    normalized_row: Dict[str, Any] = {
-        "date": "",
-        "amount": 0.0,
-        "description": "",
-        "type": "",
-        "transaction_time": "",
-        "currency": "",
-        "transaction_id": "",
-        "university_bank_name": "",
-        "university_account_number": "",
-        "payer_name": "",
-        "student_id": "",
-        "payer_email": "",
-        "academic_session": "",
-        "invoice_number": "",
-        "payment_status": "",
-    }
+    normalized_row: Dict[str, Any] = dict(DEFAULT_ROW)
 
     for key, aliases in HEADER_MAP.items():
         for alias in aliases:
             if alias in row and row[alias]:
                 if key == "amount":
-                    try:
-                        normalized_row[key] = float(
-                            str(row[alias]).replace(",", "").replace(" ", "")
-                        )
-                    except Exception:
-                        normalized_row[key] = 0.0
+                    normalized_row[key] = parse_amount(row[alias])
                 else:
                     normalized_row[key] = row[alias]
                 break
@@ -82,3 +145,87 @@ def normalize_csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
 
     return normalized_row
 
+
+class HeaderPlan:
+    """
+    Column-index plan compiled once from a CSV header line.
+
+    `normalize` and `extras` take the raw value list from `csv.reader` and
+    produce the same output as `normalize_csv_row` and the extras dict built
+    from a `csv.DictReader` row, without alias lookups per row. The
+    `Fee Type`/`Payment Method` fallback is already covered by the `type`
+    aliases, so it needs no separate per-row check.
+    """
+
+    __slots__ = ("fieldnames", "width", "single", "multi", "amount", "extra_columns")
+
+    def __init__(self, fieldnames: Sequence[str], exclude: Iterable[str] = ()):
+        self.fieldnames = list(fieldnames)
+        self.width = len(self.fieldnames)
+
+        # DictReader keeps the last value for a repeated header name
+        last_index = {name: i for i, name in enumerate(self.fieldnames)}
+
+        self.single: List[Tuple[str, int]] = []
+        self.multi: List[Tuple[str, Tuple[int, ...]]] = []
+        self.amount: Tuple[int, ...] = ()
+        for key, aliases in HEADER_MAP.items():
+            candidates = tuple(last_index[a] for a in aliases if a in last_index)
+            if key == "amount":
+                self.amount = candidates
+            elif len(candidates) == 1:
+                self.single.append((key, candidates[0]))
+            elif candidates:
+                self.multi.append((key, candidates))
+
+        excluded = set(exclude)
+        seen = set()
+        self.extra_columns: List[Tuple[str, int]] = []
+        for name in self.fieldnames:
+            if name in seen or name in excluded:
+                continue
+            seen.add(name)
+            self.extra_columns.append((name, last_index[name]))
+
+    def _first_value(self, values: Sequence[str], candidates: Tuple[int, ...]) -> Optional[str]:
+        n = len(values)
+        for i in candidates:
+            if i < n and values[i]:
+                return values[i]
+        return None
+
+    def normalize(self, values: Sequence[str]) -> Dict[str, Any]:
+        """Apply the plan to one row of raw values."""
+        n = len(values)
+        row = dict(DEFAULT_ROW)
+        for key, i in self.single:
+            if i < n and values[i]:
+                row[key] = values[i]
+        for key, candidates in self.multi:
+            value = self._first_value(values, candidates)
+            if value is not None:
+                row[key] = value
+        if self.amount:
+            value = self._first_value(values, self.amount)
+            if value is not None:
+                row["amount"] = parse_amount(value)
+        return row
+
+    def extras(self, values: Sequence[str]) -> Dict[Any, Any]:
+        """Non-empty values of the non-excluded columns, keyed by header name."""
+        n = len(values)
+        data: Dict[Any, Any] = {
+            name: values[i] for name, i in self.extra_columns if i < n and values[i] != ''
+        }
+        if n > self.width:
+            # DictReader collects surplus values under a None key
+            data[None] = list(values[self.width:])
+        return data
+
+
+def compile_header_plan(fieldnames: Sequence[str], exclude: Iterable[str] = ()) -> HeaderPlan:
+    """
+    Compile a `HeaderPlan` for a CSV header. Columns named in `exclude` are
+    left out of `HeaderPlan.extras`.
+    """
+    return HeaderPlan(fieldnames, exclude)
@@ -0,0 +1,113 @@
+"""
+Vectorized CSV normalization for large uploads.
+
+Reads a CSV in chunks with `pandas.read_csv` and applies a `HeaderPlan`
+column-wise: aliases are resolved with `Series.where`, amounts are cleaned with
+vectorized string ops and `to_numeric`, and the `data` extras are built one
+column at a time. Results match `normalize_csv_row`, including the `0.0`
+default for amounts that do not parse. Surplus fields on rows longer than the
+header are dropped rather than collected under a `None` key.
+
+pandas is optional at runtime; `available()` reports whether it is installed.
+"""
+
+import csv
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from app.parsers.csv_normalizer import DEFAULT_ROW, HeaderPlan, compile_header_plan, parse_amount
+from app.parsers.stream_reader import iter_text_lines
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - pandas is optional
+    pd = None
+
+
+def available() -> bool:
+    return pd is not None
+
+
+def _first_non_empty(frame, candidates: Sequence[int]):
+    """Per row, the value of the first candidate column that is non-empty."""
+    result = frame[candidates[-1]]
+    for i in reversed(candidates[:-1]):
+        column = frame[i]
+        result = column.where(column != "", result)
+    return result
+
+
+def _parse_amounts(raw):
+    cleaned = raw.str.replace(",", "", regex=False).str.replace(" ", "", regex=False)
+    amounts = pd.to_numeric(cleaned, errors="coerce")
+    # Values to_numeric rejects but float() may accept (e.g. "1_000", "nan")
+    retry = amounts.isna() & (raw != "")
+    amounts = amounts.fillna(0.0).astype(float)
+    if retry.any():
+        amounts[retry] = raw[retry].map(parse_amount)
+    return amounts
+
+
+def normalize_frame(frame, plan: HeaderPlan):
+    """Normalize one chunk of raw string columns into the unified schema."""
+    frame = frame.fillna("")
+    single = dict(plan.single)
+    multi = dict(plan.multi)
+
+    columns = {}
+    for key, default in DEFAULT_ROW.items():
+        if key == "amount":
+            if plan.amount:
+                columns[key] = _parse_amounts(_first_non_empty(frame, plan.amount))
+            else:
+                columns[key] = pd.Series(default, index=frame.index, dtype=float)
+        elif key in single:
+            columns[key] = frame[single[key]]
+        elif key in multi:
+            columns[key] = _first_non_empty(frame, multi[key])
+        else:
+            columns[key] = pd.Series(default, index=frame.index, dtype=object)
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def frame_extras(frame, plan: HeaderPlan) -> List[Dict[str, Any]]:
+    """Build the per-row `data` extras one column at a time."""
+    frame = frame.fillna("")
+    extras: List[Dict[str, Any]] = [{} for _ in range(len(frame))]
+    for name, i in plan.extra_columns:
+        column = frame[i]
+        mask = (column != "").to_numpy()
+        for pos, value in zip(mask.nonzero()[0], column[mask].tolist()):
+            extras[pos][name] = value
+    return extras
+
+
+def iter_normalized_frames(
+    stream: BinaryIO,
+    exclude: Iterable[str] = (),
+    chunksize: int = 50000,
+) -> Iterator[Tuple[Any, List[Dict[str, Any]]]]:
+    """
+    Yield `(normalized DataFrame, extras list)` pairs for each chunk of a CSV.
+    """
+    stream.seek(0)
+    header = next(csv.reader(iter_text_lines(stream)), None)
+    if not header:
+        return
+    plan = compile_header_plan(header, exclude=exclude)
+    stream.seek(0)
+
+    reader = pd.read_csv(
+        stream,
+        header=None,
+        skiprows=1,
+        names=list(range(plan.width)),
+        index_col=False,
+        dtype=str,
+        keep_default_na=False,
+        na_filter=False,
+        encoding="utf-8-sig",
+        chunksize=chunksize,
+    )
+    for frame in reader:
+        frame = frame.reset_index(drop=True)
+        yield normalize_frame(frame, plan), frame_extras(frame, plan)
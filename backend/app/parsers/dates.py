@@ -0,0 +1,97 @@
+"""
+Date normalization for the typed `txn_date` / `txn_timestamp` columns.
+
+Banks send the `date` field as MT940 `YYMMDD`, ISO `YYYY-MM-DD` (optionally
+with a time), `YYYYMMDD` or day-first `DD/MM/YYYY`. Text that matches none of
+these parses to None. Parsed strings are memoized, since an upload repeats
+the same few hundred dates across all of its rows.
+"""
+
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+_SEPARATED = re.compile(r"(\d{1,4})[/.\-](\d{1,2})[/.\-](\d{1,4})")
+_TIME = re.compile(r"(\d{1,2}):(\d{2})(?::(\d{2}))?")
+
+# Keys that carry a separate transaction time, in normalized rows or `data`
+TIME_KEYS = ("transaction_time", "Transaction Time")
+
+
+def _year(value: int) -> int:
+    """Expand two-digit years as MT940 does (00-79 -> 2000s, 80-99 -> 1900s)."""
+    if value >= 100:
+        return value
+    return 2000 + value if value < 80 else 1900 + value
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_text(text: str) -> Optional[date]:
+    try:
+        if text.isdigit():
+            if len(text) == 6:
+                return date(_year(int(text[:2])), int(text[2:4]), int(text[4:6]))
+            if len(text) == 8:
+                return date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+            return None
+        match = _SEPARATED.match(text)
+        if not match:
+            return None
+        first, second, third = match.groups()
+        if len(first) == 4:
+            return date(int(first), int(second), int(third))
+        day, month = int(first), int(second)
+        if month > 12 >= day:
+            day, month = month, day
+        return date(_year(int(third)), month, day)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_time_text(text: str) -> Optional[time]:
+    match = _TIME.search(text)
+    if not match:
+        return None
+    hour, minute, second = match.groups()
+    try:
+        return time(int(hour), int(minute), int(second or 0))
+    except ValueError:
+        return None
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """Parse a bank date field to a `date`, or None if it is not recognized."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return _parse_date_text(str(value).strip())
+
+
+def parse_timestamp(date_value: Any, time_value: Any = None) -> Optional[datetime]:
+    """
+    Combine a date field with a separate time field, or with a time embedded
+    in the date text (ISO `YYYY-MM-DDTHH:MM:SS`). None when either is missing.
+    """
+    day = parse_date(date_value)
+    if day is None:
+        return None
+    at = _parse_time_text(str(time_value)) if time_value else None
+    if at is None and isinstance(date_value, str) and len(date_value) > 10:
+        at = _parse_time_text(date_value[10:])
+    return datetime.combine(day, at) if at is not None else None
+
+
+def row_time(*sources: Optional[Dict[str, Any]]) -> Any:
+    """The first transaction time found under TIME_KEYS in the given dicts."""
+    for source in sources:
+        if not source:
+            continue
+        for key in TIME_KEYS:
+            if source.get(key):
+                return source[key]
+    return None
@@ -1,10 +1,160 @@
+import io
 import re
-from typing import List, Dict
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from app.parsers.stream_reader import DEFAULT_CHUNK_SIZE, iter_text_lines
+
+_TAG = re.compile(r":(\d{2}[A-Z]?):")
+_BLOCK = re.compile(r"\{\d:|-\}?$")
+_STATEMENT_LINE = re.compile(
+    r"(?P<value_date>\d{6})(?P<entry_date>\d{4})?(?P<mark>R?[CD])(?P<funds_code>[A-Z])?"
+    r"(?P<amount>\d+(?:,\d*)?)(?P<transaction_code>[A-Z][A-Z0-9]{3})?"
+    r"(?P<customer_reference>.*?)(?://(?P<bank_reference>.*))?$"
+)
+_BALANCE = re.compile(r"(?P<mark>[CD])(?P<date>\d{6})(?P<currency>[A-Z]{3})(?P<amount>\d+(?:,\d*)?)")
+
+# Debit/credit marks; reversals (RC/RD) book in the opposite direction
+_DC_TYPES = {"C": "credit", "D": "debit", "RC": "debit", "RD": "credit"}
+_BALANCE_TAGS = {
+    "60F": "opening_balance",
+    "60M": "opening_balance",
+    "62F": "closing_balance",
+    "62M": "closing_balance",
+    "64": "available_balance",
+}
+
+
+def _parse_amount(raw: str) -> float:
+    return float(raw.replace(",", "."))
+
+
+def _parse_balance(value: str) -> Optional[Dict]:
+    match = _BALANCE.match(value)
+    if not match:
+        return None
+    amount = _parse_amount(match.group("amount"))
+    return {
+        "date": match.group("date"),
+        "currency": match.group("currency"),
+        "amount": amount if match.group("mark") == "C" else -amount,
+    }
+
+
+def _parse_statement_line(lines: List[str]) -> Optional[Dict]:
+    match = _STATEMENT_LINE.match(lines[0])
+    if not match:
+        return None
+    return {
+        "value_date": match.group("value_date"),
+        "entry_date": match.group("entry_date") or "",
+        "type": _DC_TYPES[match.group("mark")],
+        "amount": _parse_amount(match.group("amount")),
+        "description": "",
+        "funds_code": match.group("funds_code") or "",
+        "transaction_code": match.group("transaction_code") or "",
+        "customer_reference": (match.group("customer_reference") or "").strip(),
+        "bank_reference": (match.group("bank_reference") or "").strip(),
+        "supplementary_details": " ".join(lines[1:]),
+    }
+
+
+def _iter_fields(lines: Iterator[str]) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Group raw lines into `(tag, lines)` fields. Lines that do not start a new
+    tag continue the previous field (e.g. multi-line `:86:` narratives).
+    SWIFT block wrappers (`{1:...}{4:`, `-}`) are skipped.
+    """
+    tag = None
+    value: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if not line or _BLOCK.match(line):
+            continue
+        match = _TAG.match(line)
+        if match:
+            if tag is not None:
+                yield tag, value
+            tag = match.group(1)
+            value = [line[match.end():].strip()]
+        elif tag is not None:
+            value.append(line)
+    if tag is not None:
+        yield tag, value
+
+
+def iter_mt940(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream-parse an MT940 export from a binary file object.
+
+    Yields `("transaction", txn)` for each `:61:` line (with its `:86:`
+    narrative and the statement's account/reference attached),
+    `("reject", {"line": ...})` for a `:61:` line that does not parse, and
+    `("statement", meta)` once each statement ends. Only the current
+    statement is held in memory, so files of any size parse in flat memory.
+    """
+    pending: Optional[Dict] = None
+
+    def new_statement() -> Dict:
+        return {
+            "transaction_reference": "",
+            "account": "",
+            "statement_number": "",
+            "opening_balance": None,
+            "closing_balance": None,
+            "available_balance": None,
+            "information": "",
+            "transaction_count": 0,
+        }
+
+    def attach(txn: Dict) -> Dict:
+        statement["transaction_count"] += 1
+        txn["account"] = statement["account"]
+        txn["statement_number"] = statement["statement_number"]
+        txn["transaction_reference"] = statement["transaction_reference"]
+        return txn
+
+    statement = new_statement()
+    has_content = False
+
+    for tag, value in _iter_fields(iter_text_lines(stream, chunk_size)):
+        if pending is not None and tag != "86":
+            yield "transaction", attach(pending)
+            pending = None
+
+        if tag == "20":
+            if has_content:
+                yield "statement", statement
+                statement = new_statement()
+            statement["transaction_reference"] = value[0]
+        elif tag == "25":
+            statement["account"] = value[0]
+        elif tag in ("28C", "28"):
+            statement["statement_number"] = value[0]
+        elif tag in _BALANCE_TAGS:
+            statement[_BALANCE_TAGS[tag]] = _parse_balance(value[0])
+        elif tag == "61":
+            pending = _parse_statement_line(value)
+            if pending is None:
+                yield "reject", {"line": value[0]}
+        elif tag == "86":
+            narrative = " ".join(part for part in value if part)
+            if pending is not None:
+                pending["description"] = narrative
+                yield "transaction", attach(pending)
+                pending = None
+            else:
+                statement["information"] = narrative
+        has_content = True
+
+    if pending is not None:
+        yield "transaction", attach(pending)
+    if has_content:
+        yield "statement", statement
 
 
 def parse_mt940(content: str) -> List[Dict]:
     """
-    Parses a simplified MT940 string and extracts transactions.
+    Parses an MT940 string and extracts transactions.
 
     Args:
         content (str): The full MT940 file as a string.
@@ -12,30 +162,5 @@ def parse_mt940(content: str) -> List[Dict]:
     Returns:
         List[Dict]: A list of transaction dictionaries.
     """
-
-    transactions = []
-    lines = content.splitlines()
-    current_transaction = {}
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith(":61:"):
-            match = re.match(r":61:(\d{6})(\d{4})?([CD])([\d,]+)", line)
-            if match:
-                value_date = match.group(1)
-                entry_date = match.group(2) or ""
-                dc_mark = match.group(3)
-                amount = match.group(4).replace(",", ".")
-                current_transaction = {
-                    "value_date": value_date,
-                    "entry_date": entry_date,
-                    "type": "credit" if dc_mark == "C" else "debit",
-                    "amount": float(amount),
-                    "description": ""
-                }
-                transactions.append(current_transaction)
-
-        elif line.startswith(":86:") and transactions:
-            transactions[-1]["description"] = line[4:].strip()
-
-    return transactions
+    stream = io.BytesIO(content.encode("utf-8"))
+    return [record for kind, record in iter_mt940(stream) if kind == "transaction"]
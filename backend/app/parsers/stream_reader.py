@@ -0,0 +1,51 @@
+"""
+Incremental text readers for uploaded files.
+
+Uploads are read in fixed-size binary chunks and decoded incrementally, so
+parsers can consume one line at a time instead of holding the whole file
+(and its decoded copy) in memory.
+"""
+
+import codecs
+import re
+from typing import BinaryIO, Iterator
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_LINE_END = re.compile(r"\r\n|\r|\n")
+
+
+def iter_text_lines(
+    stream: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8-sig",
+) -> Iterator[str]:
+    """
+    Yield decoded lines (line endings preserved) from a binary stream.
+
+    The default `utf-8-sig` encoding strips a leading BOM, and the incremental
+    decoder keeps multi-byte characters that straddle a chunk boundary intact.
+    Line endings are kept so `csv.reader` can handle quoted multi-line fields.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+
+    while True:
+        chunk = stream.read(chunk_size)
+        final = not chunk
+        text = pending + decoder.decode(chunk, final=final)
+
+        start = 0
+        for match in _LINE_END.finditer(text):
+            # A trailing "\r" may be the first half of a "\r\n" split across chunks
+            if not final and match.end() == len(text) and match.group() == "\r":
+                break
+            yield text[start:match.end()]
+            start = match.end()
+        pending = text[start:]
+
+        if final:
+            break
+
+    if pending:
+        yield pending
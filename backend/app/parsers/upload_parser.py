@@ -0,0 +1,192 @@
+"""
+Per-file parsing for the upload flow.
+
+Turns one uploaded CSV or MT940 file into batches of `(normalized_row, data)`
+pairs, where `data` holds the extra fields destined for the JSON column. The
+functions here only depend on a binary stream, so they run the same in the
+request process and in parse-pool workers (see `services/parse_pool.py`).
+"""
+
+import csv
+import os
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from app.parsers import csv_vectorized
+from app.parsers.csv_normalizer import compile_header_plan
+from app.parsers.mt940_parser import iter_mt940
+from app.parsers.stream_reader import iter_text_lines
+
+# Uploads are read in chunks of this many bytes.
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# CSV files at least this large are normalized with pandas, in chunks of
+# VECTORIZED_CHUNK_ROWS rows. Set the threshold to 0 to always use pandas.
+VECTORIZED_CSV_MIN_BYTES = int(os.getenv("VECTORIZED_CSV_MIN_BYTES", str(50 * 1024 * 1024)))
+VECTORIZED_CHUNK_ROWS = int(os.getenv("VECTORIZED_CHUNK_ROWS", "50000"))
+
+CSV_EXTENSIONS = ('.csv',)
+MT940_EXTENSIONS = ('.txt', '.mt940')
+
+FIXED_KEYS = {'date', 'amount', 'description', 'type', 'source_file'}
+MT940_EXTRA_KEYS = (
+    'entry_date', 'funds_code', 'transaction_code', 'customer_reference',
+    'bank_reference', 'supplementary_details', 'account', 'statement_number',
+    'transaction_reference',
+)
+
+Record = Tuple[Dict[str, Any], Dict[Any, Any]]
+
+# Rejected lines kept as examples per upload; counts are always complete.
+MAX_REJECT_SAMPLES = 20
+
+
+class ParseRejects:
+    """
+    Input the parsers could not turn into rows: per-file counts of rejected
+    lines (with the first few as samples) and files whose parsing stopped
+    early. Plain data, so parse-pool workers can return it pickled.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.samples: List[Dict[str, str]] = []
+        self.errors: List[Dict[str, str]] = []
+
+    def reject(self, filename: str, reason: str, line: str) -> None:
+        self.counts[filename] = self.counts.get(filename, 0) + 1
+        if len(self.samples) < MAX_REJECT_SAMPLES:
+            self.samples.append({"source_file": filename, "reason": reason, "line": line})
+
+    def error(self, filename: str, message: str) -> None:
+        self.errors.append({"source_file": filename, "error": message})
+
+    def merge(self, other: "ParseRejects") -> None:
+        for filename, count in other.counts.items():
+            self.counts[filename] = self.counts.get(filename, 0) + count
+        self.samples.extend(other.samples[:MAX_REJECT_SAMPLES - len(self.samples)])
+        self.errors.extend(other.errors)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"count": sum(self.counts.values()), "samples": self.samples, "errors": self.errors}
+
+
+def file_extension(filename: str) -> str:
+    return os.path.splitext(filename)[1].lower()
+
+
+def normalize_mt940_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'date': row.get('value_date', ''),
+        'amount': row.get('amount', 0.0),
+        'description': row.get('description', ''),
+        'type': row.get('type', ''),
+    }
+
+
+def use_vectorized(stream: BinaryIO) -> bool:
+    """Whether a CSV stream is large enough for the pandas path."""
+    if not csv_vectorized.available():
+        return False
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size >= VECTORIZED_CSV_MIN_BYTES
+
+
+def iter_csv_vectorized_batches(stream: BinaryIO, filename: str) -> Iterator[List[Record]]:
+    """One batch per pandas chunk."""
+    frames = csv_vectorized.iter_normalized_frames(stream, FIXED_KEYS, VECTORIZED_CHUNK_ROWS)
+    for norm, extras in frames:
+        norm['source_file'] = filename
+        yield list(zip(norm.to_dict('records'), extras))
+
+
+def iter_csv_batches(stream: BinaryIO, filename: str, batch_size: int) -> Iterator[List[Record]]:
+    if use_vectorized(stream):
+        yield from iter_csv_vectorized_batches(stream, filename)
+        return
+
+    stream.seek(0)
+    reader = csv.reader(iter_text_lines(stream, UPLOAD_CHUNK_SIZE))
+    header = next(reader, None)
+    if header is None:
+        return
+    # Resolve header aliases once per file instead of once per row
+    plan = compile_header_plan(header, exclude=FIXED_KEYS)
+
+    batch: List[Record] = []
+    for values in reader:
+        if not values:
+            continue
+        norm = plan.normalize(values)
+        norm['source_file'] = filename
+        batch.append((norm, plan.extras(values)))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_mt940_batches(
+    stream: BinaryIO,
+    filename: str,
+    batch_size: int,
+    statements: List[Dict],
+    rejects: ParseRejects,
+) -> Iterator[List[Record]]:
+    """
+    Batches of MT940 transactions; statement metadata is appended to
+    `statements` as each statement ends. Unparseable `:61:` lines, and a
+    file that cannot be read to the end, are recorded in `rejects`; the
+    transactions before such an error are still ingested.
+    """
+    stream.seek(0)
+    batch: List[Record] = []
+    parsed = 0
+    try:
+        for kind, record in iter_mt940(stream, UPLOAD_CHUNK_SIZE):
+            if kind == "statement":
+                statements.append({**record, 'source_file': filename})
+                continue
+            if kind == "reject":
+                rejects.reject(filename, "unparseable :61: statement line", record["line"])
+                continue
+            parsed += 1
+
+            norm = normalize_mt940_row(record)
+            norm['source_file'] = filename
+
+            # Keep statement metadata and references with the row
+            data = {k: record[k] for k in MT940_EXTRA_KEYS if record.get(k)}
+            batch.append((norm, data))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    except (UnicodeDecodeError, ValueError) as exc:
+        # Malformed file: keep whatever parsed cleanly before the error, and say so
+        rejects.error(filename, f"parsing stopped after {parsed} transaction(s): {exc}")
+    if batch:
+        yield batch
+
+
+def iter_file_batches(
+    stream: BinaryIO,
+    filename: str,
+    batch_size: int,
+    statements: Optional[List[Dict]] = None,
+    rejects: Optional[ParseRejects] = None,
+) -> Iterator[List[Record]]:
+    """Dispatch on the file extension; unsupported files yield nothing."""
+    ext = file_extension(filename)
+    if ext in CSV_EXTENSIONS:
+        return iter_csv_batches(stream, filename, batch_size)
+    if ext in MT940_EXTENSIONS:
+        return iter_mt940_batches(
+            stream,
+            filename,
+            batch_size,
+            statements if statements is not None else [],
+            rejects if rejects is not None else ParseRejects(),
+        )
+    return iter(())
@@ -1,7 +1,30 @@
-from collections import Counter, defaultdict
-from typing import Dict, Any
+from datetime import date, timedelta
+from typing import Dict, List, Any, Optional
+from sqlalchemy import Date, Integer, String, case, cast, func
 from sqlalchemy.orm import Session
-from app.db.models import UnifiedTransaction, UserTransaction
+from app.db.models import UnifiedTransaction, UserTransaction, TransactionRollup, DailyRollup
+
+# Bucket sizes of the time-series endpoints; weeks start on Monday
+GRANULARITIES = ("day", "week", "month")
+# Most points one time-series response may hold, empty buckets included
+MAX_SERIES_POINTS = 5000
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """First day of the bucket containing `day`."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
 
 
 class AnalyticsService:
@@ -9,124 +32,198 @@ class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_unified_summary(self) -> Dict[str, Any]:
+    def _rollups(self, dataset: str):
+        return self.db.query(TransactionRollup).filter(TransactionRollup.dataset == dataset)
+    
+    def _summary(self, dataset: str, model) -> Dict[str, Any]:
         """
-        Generate summary statistics for unified transactions.
+        Compute summary statistics from the rollup table, in O(number of groups).
         """
-        rows = self.db.query(UnifiedTransaction).all()
-        
-        payments = [
-            row.amount for row in rows 
-            if isinstance(row.amount, (int, float)) and row.amount is not None
-        ]
-        
-        total_credit = sum([
-            row.amount for row in rows 
-            if getattr(row, 'type', None) == 'credit' 
-            and isinstance(row.amount, (int, float)) 
-            and row.amount is not None
-        ])
+        total_credit, total_debit, total_fees, count, largest = self.db.query(
+            func.sum(case((TransactionRollup.type == 'credit', TransactionRollup.amount_sum), else_=0)),
+            func.sum(case((TransactionRollup.type == 'debit', TransactionRollup.amount_sum), else_=0)),
+            func.sum(TransactionRollup.amount_sum),
+            func.sum(TransactionRollup.amount_count),
+            func.max(TransactionRollup.amount_max),
+        ).filter(TransactionRollup.dataset == dataset).one()
         
-        total_debit = sum([
-            row.amount for row in rows 
-            if getattr(row, 'type', None) == 'debit' 
-            and isinstance(row.amount, (int, float)) 
-            and row.amount is not None
-        ])
+        avg = total_fees / count if count else 0
         
-        total_fees = sum(payments)
-        largest = max(payments) if payments else 0
-        avg = total_fees / len(payments) if payments else 0
-        latest_balance = payments[-1] if payments else 0
+        latest_balance = (
+            self.db.query(model.amount)
+            .filter(model.amount.isnot(None))
+            .order_by(model.id.desc())
+            .limit(1)
+            .scalar()
+        )
         
         return {
             "total_credit": total_credit or 0,
             "total_debit": total_debit or 0,
             "total_fees_collected": total_fees or 0,
-            "transaction_count": len(payments),
+            "transaction_count": count or 0,
             "largest_payment": largest or 0,
             "average_payment": avg or 0,
             "latest_balance": latest_balance or 0
         }
     
+    def _type_counts(self, dataset: str) -> Dict[str, int]:
+        """
+        Count transactions per non-empty type.
+        """
+        rows = (
+            self._rollups(dataset)
+            .with_entities(TransactionRollup.type, func.sum(TransactionRollup.txn_count))
+            .filter(TransactionRollup.type != '')
+            .group_by(TransactionRollup.type)
+            .all()
+        )
+        return {type_: int(count) for type_, count in rows}
+    
+    def _source_totals(self, dataset: str) -> Dict[str, float]:
+        """
+        Sum transaction amounts per source file.
+        """
+        rows = (
+            self._rollups(dataset)
+            .with_entities(TransactionRollup.source_file, func.sum(TransactionRollup.amount_sum))
+            .filter(TransactionRollup.amount_count > 0)
+            .group_by(TransactionRollup.source_file)
+            .all()
+        )
+        return {source: float(total) for source, total in rows}
+    
+    def _bucket(self, granularity: str):
+        """SQL expression for the first day of each `DailyRollup.day`'s bucket."""
+        day = DailyRollup.day
+        if self.db.get_bind().dialect.name == "postgresql":
+            return cast(func.date_trunc(granularity, day), Date)
+        # SQLite stores dates as ISO text
+        if granularity == "month":
+            return func.strftime("%Y-%m-01", day)
+        if granularity == "week":
+            weekday = (cast(func.strftime("%w", day), Integer) + 6) % 7  # Monday = 0
+            return func.date(day, "-" + cast(weekday, String) + " days")
+        return day
+    
+    def _time_series(
+        self,
+        dataset: str,
+        granularity: str = "day",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        source_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Counts, totals and credit/debit sums per day, week or month, grouped
+        in SQL from the per-day rollup, so cost depends on the number of days
+        and groups rather than on the number of transactions. Rows without a
+        parseable date are not included. Buckets with no transactions are
+        returned with zeros. Raises ValueError for a bad granularity or range.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Invalid granularity '{granularity}'; expected one of {', '.join(GRANULARITIES)}")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from is after date_to")
+        
+        bucket = self._bucket(granularity).label("bucket")
+        query = self.db.query(
+            bucket,
+            func.sum(DailyRollup.txn_count),
+            func.sum(DailyRollup.amount_sum),
+            func.sum(case((DailyRollup.type == 'credit', DailyRollup.amount_sum), else_=0)),
+            func.sum(case((DailyRollup.type == 'debit', DailyRollup.amount_sum), else_=0)),
+        ).filter(DailyRollup.dataset == dataset)
+        if date_from:
+            query = query.filter(DailyRollup.day >= date_from)
+        if date_to:
+            query = query.filter(DailyRollup.day <= date_to)
+        if source_file is not None:
+            query = query.filter(DailyRollup.source_file == source_file)
+        
+        found = {}
+        for period, count, total, credit, debit in query.group_by(bucket).all():
+            if isinstance(period, str):
+                period = date.fromisoformat(period)
+            found[period] = (int(count or 0), total or 0, credit or 0, debit or 0)
+        
+        points: List[Dict[str, Any]] = []
+        if found or (date_from and date_to):
+            current = bucket_start(date_from or min(found), granularity)
+            end = bucket_start(date_to or max(found), granularity)
+            while current <= end:
+                if len(points) >= MAX_SERIES_POINTS:
+                    raise ValueError(
+                        f"More than {MAX_SERIES_POINTS} points; use a coarser granularity or a narrower date range"
+                    )
+                count, total, credit, debit = found.get(current, (0, 0, 0, 0))
+                points.append({
+                    "period": current.isoformat(),
+                    "count": count,
+                    "total": total,
+                    "credit": credit,
+                    "debit": debit,
+                })
+                current = _next_bucket(current, granularity)
+        
+        return {"granularity": granularity, "points": points}
+    
+    def get_unified_summary(self) -> Dict[str, Any]:
+        """
+        Generate summary statistics for unified transactions.
+        """
+        return self._summary("unified", UnifiedTransaction)
+    
     def get_pie_chart_data(self) -> Dict[str, int]:
         """
         Get transaction type counts for pie chart.
         """
-        rows = self.db.query(UnifiedTransaction).all()
-        type_counts = Counter(row.type for row in rows if row.type)
-        return dict(type_counts)
+        return self._type_counts("unified")
     
     def get_bar_chart_data(self) -> Dict[str, float]:
         """
         Get total amounts by source file for bar chart.
         """
-        rows = self.db.query(UnifiedTransaction).all()
-        source_totals = defaultdict(float)
-        
-        for row in rows:
-            if isinstance(row.amount, (int, float)):
-                source_totals[row.source_file] += row.amount
-        
-        return dict(source_totals)
+        return self._source_totals("unified")
     
     def get_org_summary(self) -> Dict[str, Any]:
         """
         Generate summary statistics for organization transactions.
         """
-        rows = self.db.query(UserTransaction).all()
-        
-        payments = [
-            row.amount for row in rows 
-            if isinstance(row.amount, (int, float)) and row.amount is not None
-        ]
-        
-        total_credit = sum([
-            row.amount for row in rows 
-            if getattr(row, 'type', None) == 'credit' 
-            and isinstance(row.amount, (int, float)) 
-            and row.amount is not None
-        ])
-        
-        total_debit = sum([
-            row.amount for row in rows 
-            if getattr(row, 'type', None) == 'debit' 
-            and isinstance(row.amount, (int, float)) 
-            and row.amount is not None
-        ])
-        
-        total_fees = sum(payments)
-        largest = max(payments) if payments else 0
-        avg = total_fees / len(payments) if payments else 0
-        latest_balance = payments[-1] if payments else 0
-        
-        return {
-            "total_credit": total_credit or 0,
-            "total_debit": total_debit or 0,
-            "total_fees_collected": total_fees or 0,
-            "transaction_count": len(payments),
-            "largest_payment": largest or 0,
-            "average_payment": avg or 0,
-            "latest_balance": latest_balance or 0
-        }
+        return self._summary("org", UserTransaction)
     
     def get_org_pie_chart_data(self) -> Dict[str, int]:
         """
         Get organization transaction type counts for pie chart.
         """
-        rows = self.db.query(UserTransaction).all()
-        type_counts = Counter(row.type for row in rows if row.type)
-        return dict(type_counts)
+        return self._type_counts("org")
     
     def get_org_bar_chart_data(self) -> Dict[str, float]:
         """
         Get total amounts by source file for organization bar chart.
         """
-        rows = self.db.query(UserTransaction).all()
-        source_totals = defaultdict(float)
-        
-        for row in rows:
-            if isinstance(row.amount, (int, float)):
-                source_totals[row.source_file] += row.amount
-        
-        return dict(source_totals)
+        return self._source_totals("org")
+    
+    def get_unified_time_series(
+        self,
+        granularity: str = "day",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        source_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get unified transaction counts and credit/debit totals per period.
+        """
+        return self._time_series("unified", granularity, date_from, date_to, source_file)
+    
+    def get_org_time_series(
+        self,
+        granularity: str = "day",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        source_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get organization transaction counts and credit/debit totals per period.
+        """
+        return self._time_series("org", granularity, date_from, date_to, source_file)
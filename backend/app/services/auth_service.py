@@ -4,6 +4,7 @@ from jose import JWTError, jwt
 import bcrypt
 from sqlalchemy.orm import Session
 from app.db.models import User
+from app.services.user_cache import user_cache
 import os
 
 # JWT settings
@@ -96,6 +97,7 @@ def deactivate_user(db: Session, user_id: int) -> bool:
         return False
     user.is_active = False
     db.commit()
+    user_cache.invalidate(user.email)
     return True
 
 def activate_user(db: Session, user_id: int) -> bool:
@@ -105,5 +107,6 @@ def activate_user(db: Session, user_id: int) -> bool:
         return False
     user.is_active = True
     db.commit()
+    user_cache.invalidate(user.email)
     return True
 
@@ -0,0 +1,43 @@
+import time
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.models import DatasetVersion
+
+
+class DataVersionService:
+    """
+    Monotonic per-dataset data versions, used as ETags by the read endpoints.
+
+    Writers bump the version in the same transaction as their changes, so a
+    reader never sees new rows under an old version. A new counter starts at
+    the current time in milliseconds rather than 1, so versions issued
+    before the table was recreated are not reused.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, dataset: str) -> int:
+        """Current version of a dataset; 0 if it has never been written."""
+        version = (
+            self.db.query(DatasetVersion.version)
+            .filter(DatasetVersion.dataset == dataset)
+            .scalar()
+        )
+        return version or 0
+
+    def bump(self, dataset: str) -> None:
+        """Increment a dataset's version in the caller's transaction."""
+        updated = (
+            self.db.query(DatasetVersion)
+            .filter(DatasetVersion.dataset == dataset)
+            .update({DatasetVersion.version: DatasetVersion.version + 1}, synchronize_session=False)
+        )
+        if updated:
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.add(DatasetVersion(dataset=dataset, version=int(time.time() * 1000)))
+        except IntegrityError:
+            # Another writer created the row first
+            self.bump(dataset)
@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func, true
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.services.rollup_service import DATASETS
+from app.services.transaction_service import (
+    LISTING_COLUMNS,
+    TransactionService,
+    listing_entities,
+    parse_sort,
+    tuple_to_item,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Rows fetched per server-side cursor batch, and written per yielded chunk.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_line(item: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(item, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class ExportService:
+    """
+    Streams a whole transaction dataset as CSV or NDJSON.
+
+    Rows are read through a server-side cursor (`yield_per`; a named cursor
+    on PostgreSQL) and encoded a batch at a time, so memory does not grow
+    with the table. CSV columns are the listing columns followed by every
+    `data` key present in the exported rows, sorted, so the header is the
+    same for the same data regardless of row order.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def extra_keys(self, model, filters: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Distinct `data` keys of the rows being exported, collected in the database."""
+        clauses = TransactionService.filter_clauses(model, filters)
+        if self.db.get_bind().dialect.name == "postgresql":
+            query = self.db.query(func.jsonb_object_keys(model.data)).filter(
+                func.jsonb_typeof(model.data) == "object", *clauses
+            )
+        else:
+            each = func.json_each(model.data).table_valued("key")
+            query = (
+                self.db.query(each.c.key)
+                .select_from(model)
+                .join(each, true())
+                .filter(func.json_type(model.data) == "object", *clauses)
+            )
+        keys = {key for (key,) in query.distinct()}
+        return sorted(key for key in keys if key is not None and key not in LISTING_COLUMNS)
+
+    def export(
+        self,
+        dataset: str,
+        fmt: str = "csv",
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "id",
+        compress: bool = False,
+    ) -> Tuple[Iterator[bytes], str, str]:
+        """
+        Validate the request and return (chunks, media type, filename).
+
+        The chunks iterator reads the rows on its own session when consumed,
+        since it outlives the request's session. Raises ValueError for an
+        unknown format or sort.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid format '{fmt}'; expected one of {', '.join(EXPORT_FORMATS)}")
+        parse_sort(sort)
+        model = DATASETS[dataset]
+
+        rows = self._rows(model, filters, sort)
+        if fmt == "csv":
+            chunks = self._csv_chunks(rows, list(LISTING_COLUMNS) + self.extra_keys(model, filters))
+        else:
+            chunks = self._ndjson_chunks(rows)
+
+        filename = f"{dataset}_transactions.{fmt}"
+        media_type = EXPORT_FORMATS[fmt]
+        if compress:
+            return _gzip(chunks), "application/gzip", filename + ".gz"
+        return chunks, media_type, filename
+
+    def _rows(self, model, filters: Optional[Dict[str, Any]], sort: str) -> Iterator[Tuple]:
+        db = SessionLocal()
+        try:
+            query = (
+                TransactionService(db)
+                .listing_query(model, filters, sort, listing_entities(model))
+                .yield_per(EXPORT_BATCH_SIZE)
+            )
+            yield from query
+        finally:
+            db.close()
+
+    def _csv_chunks(self, rows: Iterator[Tuple], header: List[str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # BOM so Excel opens the file as UTF-8
+        buffer.write("\ufeff")
+        writer.writerow(header)
+        for count, values in enumerate(rows, 1):
+            item = tuple_to_item(values)
+            writer.writerow([_cell(item.get(name)) for name in header])
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    def _ndjson_chunks(self, rows: Iterator[Tuple]) -> Iterator[bytes]:
+        lines = []
+        for values in rows:
+            lines.append(_json_line(tuple_to_item(values)))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield b"".join(lines)
+                lines = []
+        yield b"".join(lines)
@@ -0,0 +1,264 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from fastapi import UploadFile
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal, engine
+from app.db.models import IngestJob
+from app.services import parse_pool
+from app.services.rollup_service import DATASETS
+from app.services.transaction_service import decode_cursor, encode_cursor, listing_entities, tuple_to_item
+from app.services.upload_service import UploadService
+
+# Uploads are ingested by this many background threads; further jobs queue.
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+# Minimum seconds between progress writes for a running job.
+PROGRESS_INTERVAL = float(os.getenv("INGEST_PROGRESS_INTERVAL", "1.0"))
+
+_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+_dataset_locks = {"unified": threading.Lock(), "org": threading.Lock()}
+# job id -> (rows_processed, rows_per_sec) of jobs running in this process
+_live_progress: Dict[str, Tuple[int, float]] = {}
+# Jobs created before this process started cannot be running in it
+_process_started = time.time()
+
+
+@contextmanager
+def dataset_lock(dataset: str):
+    """
+    Serialize ingests into one dataset so their delete and insert phases
+    cannot interleave. On PostgreSQL an advisory lock, held on a dedicated
+    connection, extends this across worker processes.
+    """
+    with _dataset_locks[dataset]:
+        if engine.dialect.name != "postgresql":
+            yield
+            return
+        key = zlib.crc32(f"ingest:{dataset}".encode())
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+
+
+def spool_uploads(files: List[UploadFile]) -> List[Tuple[str, str]]:
+    """Copy request uploads to disk so a job can outlive the request."""
+    spooled = []
+    for file in files:
+        suffix = os.path.splitext(file.filename)[1].lower()
+        spooled.append((parse_pool.spool_to_disk(file.file, suffix), file.filename))
+    return spooled
+
+
+def job_to_dict(job: IngestJob) -> Dict[str, Any]:
+    # Progress of a job running here is fresher in memory than in its row
+    rows_processed, rows_per_sec = _live_progress.get(job.id, (job.rows_processed, job.rows_per_sec))
+    return {
+        "job_id": job.id,
+        "dataset": job.dataset,
+        "status": job.status,
+        "files": job.files or [],
+        "rows_processed": rows_processed,
+        "rows_per_sec": rows_per_sec,
+        "error": job.error,
+        "result": job.result,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _update_job(job_id: str, **fields) -> None:
+    """Write job state in its own short transaction, outside the ingest."""
+    db = SessionLocal()
+    try:
+        db.query(IngestJob).filter(IngestJob.id == job_id).update(fields, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+class _Progress:
+    """
+    Counts written rows and periodically records them on the job.
+
+    Progress is always kept in memory for `get_job`. It is also written to
+    the job row for other processes, except on SQLite: there the ingest
+    transaction holds the database write lock, so a write from a second
+    connection would fail with "database is locked".
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.last_write = self.started
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return round(self.rows / elapsed, 1) if elapsed > 0 else 0.0
+
+    def __call__(self, rows: int) -> None:
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self.last_write >= PROGRESS_INTERVAL:
+            self.last_write = now
+            _live_progress[self.job_id] = (self.rows, self.rate())
+            if engine.dialect.name != "sqlite":
+                _update_job(self.job_id, rows_processed=self.rows, rows_per_sec=self.rate())
+
+
+def _run_job(
+    job_id: str,
+    dataset: str,
+    spooled: List[Tuple[str, str]],
+    preview: int,
+    options: Dict[str, Any],
+) -> Dict[str, Any]:
+    db = SessionLocal()
+    uploads = []
+    try:
+        with dataset_lock(dataset):
+            _update_job(job_id, status="running", started_at=datetime.utcnow())
+            uploads = [UploadFile(file=open(path, "rb"), filename=name) for path, name in spooled]
+            service = UploadService(db)
+            progress = _Progress(job_id)
+            service.progress = progress
+
+            # The job id doubles as the ingest id the rows are tagged with
+            if dataset == "unified":
+                result = asyncio.run(service.process_unified_upload(uploads, preview, ingest_id=job_id, **options))
+            else:
+                result = asyncio.run(service.process_org_upload(uploads, preview, ingest_id=job_id, **options))
+
+        summary = {k: v for k, v in result.items() if k != "preview"}
+        _update_job(
+            job_id,
+            status="succeeded",
+            finished_at=datetime.utcnow(),
+            rows_processed=progress.rows,
+            rows_per_sec=progress.rate(),
+            result=summary,
+        )
+        return result
+    except Exception as exc:
+        db.rollback()
+        _update_job(job_id, status="failed", finished_at=datetime.utcnow(), error=str(exc))
+        raise
+    finally:
+        _live_progress.pop(job_id, None)
+        for upload in uploads:
+            upload.file.close()
+        for path, _ in spooled:
+            if os.path.exists(path):
+                os.remove(path)
+        db.close()
+
+
+def recover_interrupted_jobs(db: Session) -> int:
+    """
+    Mark jobs left queued or running by a previous server process as failed
+    and remove the spool files they left behind. Called at startup; returns
+    the number of jobs marked.
+    """
+    failed = (
+        db.query(IngestJob)
+        .filter(
+            IngestJob.status.in_(("queued", "running")),
+            IngestJob.created_at < datetime.utcfromtimestamp(_process_started),
+        )
+        .update(
+            {
+                IngestJob.status: "failed",
+                IngestJob.finished_at: datetime.utcnow(),
+                IngestJob.error: "Interrupted by a server restart; upload the files again",
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    parse_pool.remove_orphans(_process_started)
+    return failed
+
+
+class IngestJobService:
+    """Queues uploads for background ingestion and reports job state."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def submit(
+        self,
+        dataset: str,
+        spooled: List[Tuple[str, str]],
+        preview: int = 0,
+        **options: Any,
+    ) -> Tuple[IngestJob, Future]:
+        """
+        Record a queued job and hand it to the worker pool.
+
+        The returned future resolves to the upload response, including up to
+        `preview` ingested rows; the stored job result omits the preview.
+        `options` are passed on to the UploadService upload method (e.g.
+        `duplicates`).
+        """
+        job = IngestJob(
+            id=uuid.uuid4().hex,
+            dataset=dataset,
+            status="queued",
+            files=[name for _, name in spooled],
+            rows_processed=0,
+            rows_per_sec=0.0,
+        )
+        self.db.add(job)
+        self.db.commit()
+        future = _executor.submit(_run_job, job.id, dataset, spooled, preview, options)
+        return job, future
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.db.query(IngestJob).filter(IngestJob.id == job_id).first()
+        return job_to_dict(job) if job else None
+
+    def get_rows(self, job_id: str, page_size: int = 100, after: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Page through the rows a job wrote, in id order, as listed by the
+        transaction endpoints. Rows since deleted or replaced are gone.
+        Returns None if the job does not exist; raises ValueError for a bad cursor.
+        """
+        job = self.db.query(IngestJob).filter(IngestJob.id == job_id).first()
+        if job is None:
+            return None
+        model = DATASETS[job.dataset]
+        query = self.db.query(*listing_entities(model)).filter(model.ingest_id == job_id)
+        if after:
+            last_id, _ = decode_cursor(after)
+            query = query.filter(model.id > last_id)
+        rows = query.order_by(model.id).limit(page_size + 1).all()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(rows[-1].id)
+        return {
+            "job_id": job.id,
+            "status": job.status,
+            "items": [tuple_to_item(row) for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    def list_jobs(self, dataset: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query = self.db.query(IngestJob)
+        if dataset:
+            query = query.filter(IngestJob.dataset == dataset)
+        jobs = query.order_by(IngestJob.created_at.desc()).limit(limit).all()
+        return [job_to_dict(job) for job in jobs]
@@ -0,0 +1,102 @@
+"""
+Parallel parsing of multi-file uploads.
+
+Each uploaded file is spooled to disk and parsed by a worker in a shared
+`ProcessPoolExecutor`. Workers pickle their batches to a spool file next to
+the input; the request process replays the spool files in upload order into
+its single DB writer, so row order and `source_file` attribution do not depend
+on which worker finishes first.
+"""
+
+import contextlib
+import glob
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from app.parsers.upload_parser import ParseRejects, Record, iter_file_batches
+
+# Worker processes used to parse uploads; 0 or 1 parses in the request process.
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared pool, recreating it if the worker count changed."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def spool_to_disk(stream: BinaryIO, suffix: str = "") -> str:
+    """Copy an upload stream to a temporary file and return its path."""
+    stream.seek(0)
+    fd, path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(stream, out, 1024 * 1024)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def parse_to_spool(path: str, filename: str, batch_size: int) -> Tuple[str, List[Dict], ParseRejects]:
+    """
+    Worker entry point: parse one spooled file and pickle its batches.
+
+    Returns the spool file path, any MT940 statement metadata and the
+    lines the parser rejected.
+    """
+    statements: List[Dict] = []
+    rejects = ParseRejects()
+    out_path = path + ".batches"
+    with open(path, "rb") as src, open(out_path, "wb") as out:
+        for batch in iter_file_batches(src, filename, batch_size, statements, rejects):
+            pickle.dump(batch, out, protocol=pickle.HIGHEST_PROTOCOL)
+    return out_path, statements, rejects
+
+
+def iter_spooled_batches(path: str) -> Iterator[List[Record]]:
+    """Replay the batches written by `parse_to_spool`, then delete the file."""
+    try:
+        with open(path, "rb") as fh:
+            while True:
+                try:
+                    yield pickle.load(fh)
+                except EOFError:
+                    break
+    finally:
+        os.remove(path)
+
+
+def discard(path: str) -> None:
+    """Remove a spooled input and its batch file, whichever still exist."""
+    for name in (path, path + ".batches"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(name)
+
+
+def remove_orphans(before: float) -> int:
+    """
+    Remove spooled uploads and batch files last modified before `before` (a
+    timestamp), e.g. left behind by a process that crashed mid-ingest.
+    Returns the number of files removed.
+    """
+    removed = 0
+    for path in glob.glob(os.path.join(SPOOL_DIR or tempfile.gettempdir(), "upload_*")):
+        with contextlib.suppress(FileNotFoundError):
+            if os.path.getmtime(path) < before:
+                os.remove(path)
+                removed += 1
+    return removed
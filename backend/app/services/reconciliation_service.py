@@ -0,0 +1,339 @@
+"""
+Bank-vs-organization reconciliation.
+
+Pairs `unified_transactions` (bank side) with `user_transactions` (fee
+records) in two passes, without nested loops:
+
+1. Reference hash join: org rows are hashed by invoice number and
+   transaction id; each bank row probes with its own references.
+2. Amount + date sort-merge: remaining rows are hashed by amount (in
+   tolerance-sized buckets) and, for each bank bucket, the org rows of that
+   bucket and its two neighbours are walked in date order with two
+   pointers. Each bank row takes the earliest open org row inside the date
+   window whose amount is within tolerance, which pairs as many rows as the
+   window allows. Taken org rows are skipped through a next-open pointer and
+   the scan stops after MAX_CANDIDATES hits, so many rows sharing one amount
+   (fixed fees) stay cheap.
+
+A pair is `ambiguous` rather than `matched` when other org rows fit the bank
+row equally well; the chosen pair is kept as a suggestion along with the
+alternatives. Everything left over is `unmatched_bank` or `unmatched_org`.
+Results are persisted per run and paged by id.
+"""
+import math
+import os
+import time
+import uuid
+from bisect import bisect_right
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.db.bulk_writer import BulkWriter
+from app.db.models import ReconciliationResult, ReconciliationRun, UnifiedTransaction, UserTransaction
+from app.services.ingest_jobs import dataset_lock
+from app.services.transaction_service import decode_cursor, encode_cursor, row_to_item
+
+# Finished runs kept (with their results); older ones are deleted.
+RECON_KEEP_RUNS = int(os.getenv("RECON_KEEP_RUNS", "5"))
+LOAD_BATCH_SIZE = 50000
+MAX_CANDIDATES = 10
+
+STATUSES = ("matched", "ambiguous", "unmatched_bank", "unmatched_org")
+RESULT_FIELDS = ("status", "method", "bank_id", "org_id", "amount_diff", "day_diff", "candidates")
+
+# (id, amount, date ordinal, invoice_number, transaction_id)
+Record = Tuple[int, Optional[float], Optional[int], Optional[str], Optional[str]]
+
+
+def _load(db: Session, model) -> List[Record]:
+    query = (
+        db.query(model.id, model.amount, model.txn_date, model.invoice_number, model.transaction_id)
+        .order_by(model.id)
+        .yield_per(LOAD_BATCH_SIZE)
+    )
+    return [
+        (txn_id, amount, day.toordinal() if day else None, invoice or None, reference or None)
+        for txn_id, amount, day, invoice, reference in query
+    ]
+
+
+def match_records(
+    bank: List[Record],
+    org: List[Record],
+    amount_tolerance: float = 0.01,
+    date_window_days: int = 3,
+) -> List[Dict[str, Any]]:
+    """
+    Pair bank and org records; returns one dict with RESULT_FIELDS per pair
+    or unmatched row. Pure function of its inputs, so it can be benchmarked
+    without a DB.
+    """
+    results: List[Dict[str, Any]] = []
+    bank_done = bytearray(len(bank))
+    org_used = bytearray(len(org))
+    # Absorbs float error, e.g. 100.01 - 100.00 > 0.01
+    max_diff = amount_tolerance + 1e-9
+
+    def pair(bi: int, oi: int, method: str, candidates: Optional[List[int]] = None) -> None:
+        b, o = bank[bi], org[oi]
+        bank_done[bi] = 1
+        org_used[oi] = 1
+        ambiguous = candidates is not None and len(candidates) > 1
+        results.append({
+            "status": "ambiguous" if ambiguous else "matched",
+            "method": method,
+            "bank_id": b[0],
+            "org_id": o[0],
+            "amount_diff": b[1] - o[1] if b[1] is not None and o[1] is not None else None,
+            "day_diff": b[2] - o[2] if b[2] is not None and o[2] is not None else None,
+            "candidates": [org[i][0] for i in candidates[:MAX_CANDIDATES]] if ambiguous else None,
+        })
+
+    # Pass 1: hash join on invoice number / transaction id
+    by_reference: Dict[str, List[int]] = {}
+    for oi, (_, _, _, invoice, reference) in enumerate(org):
+        if invoice:
+            by_reference.setdefault(invoice, []).append(oi)
+        if reference and reference != invoice:
+            by_reference.setdefault(reference, []).append(oi)
+
+    for bi, (_, amount, day, invoice, reference) in enumerate(bank):
+        hits = by_reference.get(invoice) if invoice else None
+        other = by_reference.get(reference) if reference and reference != invoice else None
+        if hits is None:
+            hits, other = other, None
+        if hits is None:
+            continue
+        if other is None and len(hits) == 1:
+            # Common case: the reference identifies exactly one org row
+            if not org_used[hits[0]]:
+                pair(bi, hits[0], "reference")
+            continue
+
+        candidates = list(dict.fromkeys(oi for oi in hits + (other or []) if not org_used[oi]))
+        if not candidates:
+            continue
+        if len(candidates) > 1 and amount is not None:
+            close = [
+                oi for oi in candidates
+                if org[oi][1] is not None and abs(org[oi][1] - amount) <= max_diff
+            ]
+            candidates = close or candidates
+        if len(candidates) > 1:
+            candidates.sort(key=lambda oi: (
+                abs(day - org[oi][2]) if day is not None and org[oi][2] is not None else float("inf"),
+                org[oi][0],
+            ))
+        pair(bi, candidates[0], "reference", candidates)
+
+    # Pass 2: hash on amount / tolerance, then merge date-sorted runs. Amounts
+    # within tolerance of each other land in the same or an adjacent bucket.
+    def bucket(amount: float) -> float:
+        return math.floor(amount / amount_tolerance) if amount_tolerance > 0 else amount
+
+    neighbours = (-1, 0, 1) if amount_tolerance > 0 else (0,)
+    org_buckets: Dict[Any, List[Tuple[int, int, int]]] = {}
+    for oi, (txn_id, amount, day, _, _) in enumerate(org):
+        if not org_used[oi] and amount is not None and day is not None:
+            org_buckets.setdefault(bucket(amount), []).append((day, txn_id, oi))
+    bank_buckets: Dict[Any, List[Tuple[int, int, int]]] = {}
+    for bi, (txn_id, amount, day, _, _) in enumerate(bank):
+        if not bank_done[bi] and amount is not None and day is not None:
+            bank_buckets.setdefault(bucket(amount), []).append((day, txn_id, bi))
+
+    for key, bank_rows in bank_buckets.items():
+        org_rows = [row for k in neighbours for row in org_buckets.get(key + k, ())]
+        if not org_rows:
+            continue
+        bank_rows.sort()
+        org_rows.sort()
+        days = [day for day, _, _ in org_rows]
+        # nxt[j]: first org row at or after j that may still be open; taken
+        # rows are linked past (path-compressed), so each is skipped once
+        nxt = list(range(len(org_rows) + 1))
+
+        def next_open(j: int) -> int:
+            path = []
+            while j < len(org_rows) and (nxt[j] != j or org_used[org_rows[j][2]]):
+                if nxt[j] == j:
+                    nxt[j] = j + 1
+                path.append(j)
+                j = nxt[j]
+            for p in path:
+                nxt[p] = j
+            return j
+
+        def open_rows(j: int, hi: int) -> Iterator[int]:
+            j = next_open(j)
+            while j < hi:
+                yield org_rows[j][2]
+                j = next_open(j + 1)
+
+        ptr = 0
+        for day, _, bi in bank_rows:
+            # Org rows before the window can no longer pair with later bank rows
+            while ptr < len(org_rows) and days[ptr] < day - date_window_days:
+                ptr += 1
+            hi = bisect_right(days, day + date_window_days, lo=ptr)
+            amount = bank[bi][1]
+            window = list(islice(
+                (oi for oi in open_rows(ptr, hi) if abs(org[oi][1] - amount) <= max_diff), MAX_CANDIDATES
+            ))
+            if len(window) == 1:
+                pair(bi, window[0], "amount_date")
+            elif window:
+                pair(bi, window[0], "amount_date", window)
+
+    unmatched = dict.fromkeys(RESULT_FIELDS)
+    for bi, record in enumerate(bank):
+        if not bank_done[bi]:
+            results.append({**unmatched, "status": "unmatched_bank", "bank_id": record[0]})
+    for oi, record in enumerate(org):
+        if not org_used[oi]:
+            results.append({**unmatched, "status": "unmatched_org", "org_id": record[0]})
+    return results
+
+
+def run_to_dict(run: ReconciliationRun) -> Dict[str, Any]:
+    return {
+        "run_id": run.id,
+        "status": run.status,
+        "params": run.params,
+        "summary": run.summary,
+        "error": run.error,
+        "created_at": run.created_at,
+        "finished_at": run.finished_at,
+    }
+
+
+class ReconciliationService:
+    """Runs reconciliations and pages through their persisted results."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def run(self, amount_tolerance: float = 0.01, date_window_days: int = 3) -> Dict[str, Any]:
+        """
+        Reconcile the current bank and org data and persist the results.
+        Ingests into either dataset wait until the run has read its input.
+        """
+        run = ReconciliationRun(
+            id=uuid.uuid4().hex,
+            status="running",
+            params={"amount_tolerance": amount_tolerance, "date_window_days": date_window_days},
+        )
+        self.db.add(run)
+        self.db.commit()
+
+        start = time.perf_counter()
+        try:
+            with dataset_lock("unified"), dataset_lock("org"):
+                bank = _load(self.db, UnifiedTransaction)
+                org = _load(self.db, UserTransaction)
+            results = match_records(bank, org, amount_tolerance, date_window_days)
+
+            counts = {status: 0 for status in STATUSES}
+            by_method: Dict[str, int] = {}
+            for r in results:
+                r["run_id"] = run.id
+                counts[r["status"]] += 1
+                if r["method"]:
+                    by_method[r["method"]] = by_method.get(r["method"], 0) + 1
+
+            writer = BulkWriter(self.db, ReconciliationResult)
+            writer.add_many(results)
+            writer.flush()
+            run.summary = {
+                "bank_rows": len(bank),
+                "org_rows": len(org),
+                **counts,
+                "by_method": by_method,
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+            run.status = "succeeded"
+            run.finished_at = datetime.utcnow()
+            self.db.commit()
+        except Exception as exc:
+            self.db.rollback()
+            run.status = "failed"
+            run.error = str(exc)
+            run.finished_at = datetime.utcnow()
+            self.db.commit()
+            raise
+
+        self._prune()
+        return run_to_dict(run)
+
+    def _prune(self) -> None:
+        """Delete runs (and their results) beyond the newest RECON_KEEP_RUNS."""
+        old = [
+            run_id for (run_id,) in self.db.query(ReconciliationRun.id)
+            .order_by(ReconciliationRun.created_at.desc())
+            .offset(RECON_KEEP_RUNS)
+            .all()
+        ]
+        if not old:
+            return
+        self.db.query(ReconciliationResult).filter(ReconciliationResult.run_id.in_(old)).delete(synchronize_session=False)
+        self.db.query(ReconciliationRun).filter(ReconciliationRun.id.in_(old)).delete(synchronize_session=False)
+        self.db.commit()
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        run = self.db.query(ReconciliationRun).filter(ReconciliationRun.id == run_id).first()
+        return run_to_dict(run) if run else None
+
+    def list_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        runs = self.db.query(ReconciliationRun).order_by(ReconciliationRun.created_at.desc()).limit(limit).all()
+        return [run_to_dict(run) for run in runs]
+
+    def get_results(
+        self,
+        run_id: str,
+        status: Optional[str] = None,
+        page_size: int = 50,
+        after: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Page a run's results in id order, each with its bank and org rows.
+        Raises ValueError for an unknown status or a bad cursor.
+        """
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Invalid status '{status}'; expected one of {', '.join(STATUSES)}")
+        query = self.db.query(ReconciliationResult).filter(ReconciliationResult.run_id == run_id)
+        if status:
+            query = query.filter(ReconciliationResult.status == status)
+        if after:
+            query = query.filter(ReconciliationResult.id > decode_cursor(after)[0])
+        results = query.order_by(ReconciliationResult.id).limit(page_size + 1).all()
+
+        next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            next_cursor = encode_cursor(results[-1].id)
+
+        bank_ids = [r.bank_id for r in results if r.bank_id is not None]
+        org_ids = [r.org_id for r in results if r.org_id is not None]
+        bank_rows = {
+            row.id: row_to_item(row)
+            for row in self.db.query(UnifiedTransaction).filter(UnifiedTransaction.id.in_(bank_ids)).all()
+        } if bank_ids else {}
+        org_rows = {
+            row.id: row_to_item(row)
+            for row in self.db.query(UserTransaction).filter(UserTransaction.id.in_(org_ids)).all()
+        } if org_ids else {}
+
+        items = [
+            {
+                "id": r.id,
+                "status": r.status,
+                "method": r.method,
+                "amount_diff": r.amount_diff,
+                "day_diff": r.day_diff,
+                "candidates": r.candidates,
+                "bank": bank_rows.get(r.bank_id),
+                "org": org_rows.get(r.org_id),
+            }
+            for r in results
+        ]
+        return {"items": items, "next_cursor": next_cursor}
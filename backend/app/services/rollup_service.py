@@ -0,0 +1,357 @@
+import operator
+from datetime import date
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import case, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.models import UnifiedTransaction, UserTransaction, TransactionRollup, DailyRollup
+from app.services.data_version import DataVersionService
+
+# Dataset name -> transaction model. Names match the route prefixes.
+DATASETS = {
+    "unified": UnifiedTransaction,
+    "org": UserTransaction,
+}
+
+ROLLUP_FIELDS = ("txn_count", "amount_count", "amount_sum", "amount_min", "amount_max")
+DAILY_FIELDS = ("txn_count", "amount_count", "amount_sum")
+
+GroupKey = Tuple[str, str]
+DayKey = Tuple[date, str, str]
+
+
+class RollupDelta:
+    """
+    Accumulates per-group changes in memory while rows are written, so the
+    rollup table is touched once per group rather than once per row.
+    """
+
+    def __init__(self):
+        self.groups: Dict[GroupKey, Dict[str, Any]] = {}
+        # (day, type, source_file) -> [txn_count, amount_count, amount_sum]
+        self.days: Dict[DayKey, List[Any]] = {}
+
+    def _group(self, type_: Optional[str], source_file: Optional[str]) -> Dict[str, Any]:
+        key = (type_ or "", source_file or "")
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {
+                "txn_count": 0,
+                "amount_count": 0,
+                "amount_sum": 0.0,
+                "amount_min": None,
+                "amount_max": None,
+                "removed_min": None,
+                "removed_max": None,
+            }
+        return group
+
+    def _day(
+        self, day: Optional[date], type_: Optional[str], source_file: Optional[str], sign: int, amount: Optional[float]
+    ) -> None:
+        if day is None:
+            return
+        key = (day, type_ or "", source_file or "")
+        counts = self.days.get(key)
+        if counts is None:
+            counts = self.days[key] = [0, 0, 0.0]
+        counts[0] += sign
+        if amount is not None:
+            counts[1] += sign
+            counts[2] += sign * amount
+
+    def add(
+        self, type_: Optional[str], source_file: Optional[str], amount: Optional[float], day: Optional[date] = None
+    ) -> None:
+        self._day(day, type_, source_file, 1, amount)
+        group = self._group(type_, source_file)
+        group["txn_count"] += 1
+        if amount is None:
+            return
+        group["amount_count"] += 1
+        group["amount_sum"] += amount
+        if group["amount_min"] is None or amount < group["amount_min"]:
+            group["amount_min"] = amount
+        if group["amount_max"] is None or amount > group["amount_max"]:
+            group["amount_max"] = amount
+
+    def remove(
+        self, type_: Optional[str], source_file: Optional[str], amount: Optional[float], day: Optional[date] = None
+    ) -> None:
+        self._day(day, type_, source_file, -1, amount)
+        group = self._group(type_, source_file)
+        group["txn_count"] -= 1
+        if amount is None:
+            return
+        group["amount_count"] -= 1
+        group["amount_sum"] -= amount
+        if group["removed_min"] is None or amount < group["removed_min"]:
+            group["removed_min"] = amount
+        if group["removed_max"] is None or amount > group["removed_max"]:
+            group["removed_max"] = amount
+
+
+class RollupService:
+    """
+    Maintains and verifies the `transaction_rollups` aggregate table and its
+    per-day counterpart, `transaction_daily_rollups`.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _rollups(self, dataset: str):
+        return self.db.query(TransactionRollup).filter(TransactionRollup.dataset == dataset)
+
+    def _daily(self, dataset: str):
+        return self.db.query(DailyRollup).filter(DailyRollup.dataset == dataset)
+
+    def count(self, dataset: str, type_: Optional[str] = None, source_file: Optional[str] = None) -> int:
+        """
+        Row count of a dataset, optionally for one type and/or source file,
+        read from the rollup instead of COUNT(*).
+        """
+        query = self._rollups(dataset)
+        if type_ is not None:
+            query = query.filter(TransactionRollup.type == type_)
+        if source_file is not None:
+            query = query.filter(TransactionRollup.source_file == source_file)
+        total = query.with_entities(func.sum(TransactionRollup.txn_count)).scalar()
+        return int(total or 0)
+
+    def reset(self, dataset: str) -> None:
+        """
+        Drop all rollup groups for a dataset (used when its table is cleared).
+        """
+        self._rollups(dataset).delete(synchronize_session=False)
+        self._daily(dataset).delete(synchronize_session=False)
+
+    def reset_source(self, dataset: str, source_file: str) -> None:
+        """
+        Drop the rollup groups of one source file (used when its rows are replaced).
+        """
+        self._rollups(dataset).filter(TransactionRollup.source_file == source_file).delete(synchronize_session=False)
+        self._daily(dataset).filter(DailyRollup.source_file == source_file).delete(synchronize_session=False)
+
+    def _group(self, model, dataset: str, key_names: Tuple[str, ...], key: Tuple):
+        return self.db.query(model).filter(
+            model.dataset == dataset, *(getattr(model, name) == value for name, value in zip(key_names, key))
+        )
+
+    def _increment(
+        self, model, dataset: str, key_names: Tuple[str, ...], changes: Dict[Tuple, Dict[str, Any]]
+    ) -> None:
+        """
+        Add per-group changes to a rollup table in the caller's transaction.
+
+        Counts and sums are incremented in SQL (`SET txn_count = txn_count +
+        :d`) rather than read and written back, so concurrent writers to a
+        dataset do not lose each other's updates. Groups that do not exist yet
+        are inserted; if another writer created one first, its changes are
+        applied as an increment instead.
+        """
+        missing: Dict[Tuple, Dict[str, Any]] = {}
+        for key, change in changes.items():
+            values = {getattr(model, field): getattr(model, field) + change[field] for field in DAILY_FIELDS}
+            for field, extreme in (("amount_min", operator.gt), ("amount_max", operator.lt)):
+                value = change.get(field)
+                if value is not None:
+                    column = getattr(model, field)
+                    values[column] = case((or_(column.is_(None), extreme(column, value)), value), else_=column)
+            if not self._group(model, dataset, key_names, key).update(values, synchronize_session=False):
+                missing[key] = change
+
+        new = [
+            model(
+                dataset=dataset,
+                **dict(zip(key_names, key)),
+                **{field: change[field] for field in ROLLUP_FIELDS if field in change},
+            )
+            for key, change in missing.items()
+            if change["txn_count"] > 0
+        ]
+        if not new:
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.add_all(new)
+        except IntegrityError:
+            # Another writer created some of these groups first
+            self._increment(model, dataset, key_names, missing)
+
+    def apply(self, dataset: str, delta: RollupDelta) -> None:
+        """
+        Merge a delta into the rollup table in the caller's transaction.
+
+        Min/max cannot be decremented, so a group whose current extreme was
+        removed has them recomputed from the transaction table for that
+        group only.
+        """
+        if not delta.groups:
+            return
+
+        key_names = ("type", "source_file")
+        self._increment(TransactionRollup, dataset, key_names, delta.groups)
+
+        model = DATASETS[dataset]
+        for key, change in delta.groups.items():
+            if change["removed_min"] is None:
+                continue
+            query = self._group(TransactionRollup, dataset, key_names, key)
+            current = query.with_entities(TransactionRollup.amount_min, TransactionRollup.amount_max).first()
+            if current is None:
+                continue
+            low, high = current
+            if (low is not None and change["removed_min"] <= low) or (
+                high is not None and change["removed_max"] >= high
+            ):
+                group = self._aggregate(model, key)
+                query.update(
+                    {TransactionRollup.amount_min: group["amount_min"], TransactionRollup.amount_max: group["amount_max"]},
+                    synchronize_session=False,
+                )
+
+        self._rollups(dataset).filter(TransactionRollup.txn_count <= 0).delete(synchronize_session=False)
+        self._apply_daily(dataset, delta)
+
+    def _apply_daily(self, dataset: str, delta: RollupDelta) -> None:
+        """
+        Merge the per-day part of a delta. Days hold only counts and sums,
+        which can be decremented, so nothing is ever recomputed.
+        """
+        if not delta.days:
+            return
+        changes = {key: dict(zip(DAILY_FIELDS, counts)) for key, counts in delta.days.items()}
+        self._increment(DailyRollup, dataset, ("day", "type", "source_file"), changes)
+        days = [key[0] for key in delta.days]
+        self._daily(dataset).filter(
+            DailyRollup.day.between(min(days), max(days)), DailyRollup.txn_count <= 0
+        ).delete(synchronize_session=False)
+
+    def _aggregate(self, model, key: Optional[GroupKey] = None) -> Any:
+        """
+        Aggregate the transaction table per group, or for a single group.
+        """
+        type_col = func.coalesce(model.type, "")
+        source_col = func.coalesce(model.source_file, "")
+        query = self.db.query(
+            type_col,
+            source_col,
+            func.count(model.id),
+            func.count(model.amount),
+            func.coalesce(func.sum(model.amount), 0.0),
+            func.min(model.amount),
+            func.max(model.amount),
+        )
+        if key is not None:
+            query = query.filter(type_col == key[0], source_col == key[1])
+        groups = {}
+        for type_, source_file, *values in query.group_by(type_col, source_col).all():
+            groups[(type_, source_file)] = dict(zip(ROLLUP_FIELDS, values))
+        if key is not None:
+            return groups.get(key, dict(zip(ROLLUP_FIELDS, (0, 0, 0.0, None, None))))
+        return groups
+
+    def _aggregate_daily(self, model) -> Dict[DayKey, Dict[str, Any]]:
+        """
+        Aggregate the transaction table per day, type and source file.
+        """
+        type_col = func.coalesce(model.type, "")
+        source_col = func.coalesce(model.source_file, "")
+        query = (
+            self.db.query(
+                model.txn_date,
+                type_col,
+                source_col,
+                func.count(model.id),
+                func.count(model.amount),
+                func.coalesce(func.sum(model.amount), 0.0),
+            )
+            .filter(model.txn_date.isnot(None))
+            .group_by(model.txn_date, type_col, source_col)
+        )
+        return {(day, type_, source_file): dict(zip(DAILY_FIELDS, values)) for day, type_, source_file, *values in query}
+
+    def rebuild(self, dataset: str) -> None:
+        """
+        Recompute every rollup group for a dataset from the transaction table.
+        """
+        self.reset(dataset)
+        for (type_, source_file), values in self._aggregate(DATASETS[dataset]).items():
+            self.db.add(TransactionRollup(dataset=dataset, type=type_, source_file=source_file, **values))
+        self.rebuild_daily(dataset)
+
+    def rebuild_daily(self, dataset: str) -> None:
+        """
+        Recompute every per-day rollup group for a dataset from the transaction
+        table. Analytics read from the rollups may change, so the dataset's
+        data version is bumped.
+        """
+        self._daily(dataset).delete(synchronize_session=False)
+        DataVersionService(self.db).bump(dataset)
+        for (day, type_, source_file), values in self._aggregate_daily(DATASETS[dataset]).items():
+            self.db.add(DailyRollup(dataset=dataset, day=day, type=type_, source_file=source_file, **values))
+
+    def ensure_built(self) -> None:
+        """
+        Build rollups for datasets that have transactions but no rollup rows yet,
+        e.g. data loaded before the rollup tables existed.
+        """
+        for dataset, model in DATASETS.items():
+            if self._rollups(dataset).first() is None and self.db.query(model.id).first() is not None:
+                self.rebuild(dataset)
+            elif (
+                self._daily(dataset).first() is None
+                and self.db.query(model.id).filter(model.txn_date.isnot(None)).first() is not None
+            ):
+                self.rebuild_daily(dataset)
+        self.db.commit()
+
+    def check(self, dataset: str, tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+        """
+        Diff the incrementally maintained rollups (overall and per day)
+        against a from-scratch rebuild.
+
+        Returns one entry per mismatching group, with a `day` for per-day
+        groups; an empty list means consistent.
+        """
+        model = DATASETS[dataset]
+        actual = {
+            (r.type, r.source_file): {field: getattr(r, field) for field in ROLLUP_FIELDS}
+            for r in self._rollups(dataset).all()
+        }
+        mismatches = self._diff(self._aggregate(model), actual, ROLLUP_FIELDS, ("type", "source_file"), tolerance)
+
+        actual_daily = {
+            (r.day, r.type, r.source_file): {field: getattr(r, field) for field in DAILY_FIELDS}
+            for r in self._daily(dataset).all()
+        }
+        mismatches.extend(
+            self._diff(self._aggregate_daily(model), actual_daily, DAILY_FIELDS, ("day", "type", "source_file"), tolerance)
+        )
+        return mismatches
+
+    @staticmethod
+    def _diff(
+        expected: Dict[Tuple, Dict[str, Any]],
+        actual: Dict[Tuple, Dict[str, Any]],
+        fields: Tuple[str, ...],
+        key_names: Tuple[str, ...],
+        tolerance: float,
+    ) -> List[Dict[str, Any]]:
+        mismatches = []
+        for key in sorted(set(expected) | set(actual)):
+            want = expected.get(key)
+            have = actual.get(key)
+            equal = want is not None and have is not None
+            for field in fields if equal else ():
+                a, b = want[field], have[field]
+                if a is None or b is None:
+                    equal = a is b
+                else:
+                    equal = abs(a - b) <= tolerance * max(1.0, abs(a))
+                if not equal:
+                    break
+            if not equal:
+                mismatches.append({**dict(zip(key_names, key)), "expected": want, "actual": have})
+        return mismatches
@@ -0,0 +1,103 @@
+import re
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.migrations import SEARCH_TSVECTOR, has_pg_trgm
+from app.services.rollup_service import DATASETS
+from app.services.transaction_service import row_to_item
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Per-process cache of whether the pg_trgm extension is installed
+_trigram_available = None
+
+
+class SearchService:
+    """
+    Ranked search over `search_text` (description, payer name, invoice and
+    reference fields), which is filled at ingest.
+
+    PostgreSQL matches words with a GIN-indexed tsvector and, when pg_trgm is
+    installed, fuzzy word similarity through a trigram index; the score is the
+    better of the two. SQLite uses the trigger-maintained FTS5 table with
+    prefix matching ranked by bm25. Other engines fall back to a substring
+    match in id order.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, dataset: str, q: str, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """
+        Return one page of matches, best first. Raises ValueError for a query
+        without any searchable characters.
+        """
+        tokens = _TOKEN.findall(q or "")
+        if not tokens:
+            raise ValueError("Search query must contain letters or digits")
+        model = DATASETS[dataset]
+        limit, offset = page_size + 1, (page - 1) * page_size
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            hits = self._search_postgres(model.__tablename__, q.strip(), limit, offset)
+        elif dialect == "sqlite" and self._has_fts(model.__tablename__):
+            hits = self._search_fts5(model.__tablename__, tokens, limit, offset)
+        else:
+            hits = self._search_like(model, q.strip(), limit, offset)
+
+        has_more = len(hits) > page_size
+        hits = hits[:page_size]
+        rows = {row.id: row for row in self.db.query(model).filter(model.id.in_([i for i, _ in hits])).all()}
+        items = []
+        for txn_id, score in hits:
+            if txn_id in rows:
+                items.append({**row_to_item(rows[txn_id]), "score": round(float(score), 4)})
+        return {"items": items, "page": page, "page_size": page_size, "has_more": has_more}
+
+    def _trigram(self) -> bool:
+        global _trigram_available
+        if _trigram_available is None:
+            _trigram_available = has_pg_trgm(self.db.connection())
+        return _trigram_available
+
+    def _search_postgres(self, table: str, q: str, limit: int, offset: int) -> List[Tuple[int, float]]:
+        query = "websearch_to_tsquery('simple', :q)"
+        rank = f"ts_rank({SEARCH_TSVECTOR}, {query})"
+        match = f"{SEARCH_TSVECTOR} @@ {query}"
+        if self._trigram():
+            rank = f"GREATEST({rank}, word_similarity(:q, search_text))"
+            match = f"({match} OR :q <% search_text)"
+        sql = (
+            f"SELECT id, {rank} AS score FROM {table} WHERE {match} "
+            f"ORDER BY score DESC, id LIMIT :limit OFFSET :offset"
+        )
+        return [tuple(r) for r in self.db.execute(text(sql), {"q": q, "limit": limit, "offset": offset})]
+
+    def _has_fts(self, table: str) -> bool:
+        found = self.db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": f"{table}_fts"}
+        ).first()
+        return found is not None
+
+    def _search_fts5(self, table: str, tokens: List[str], limit: int, offset: int) -> List[Tuple[int, float]]:
+        # Quote each token so user input is never parsed as FTS5 syntax
+        match = " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        fts = f"{table}_fts"
+        sql = (
+            f"SELECT rowid, -bm25({fts}) AS score FROM {fts} WHERE {fts} MATCH :match "
+            f"ORDER BY score DESC, rowid LIMIT :limit OFFSET :offset"
+        )
+        return [tuple(r) for r in self.db.execute(text(sql), {"match": match, "limit": limit, "offset": offset})]
+
+    def _search_like(self, model, q: str, limit: int, offset: int) -> List[Tuple[int, float]]:
+        pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        ids = (
+            self.db.query(model.id)
+            .filter(model.search_text.ilike(pattern, escape="\\"))
+            .order_by(model.id)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+        return [(txn_id, 1.0) for (txn_id,) in ids]
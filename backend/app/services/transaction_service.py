@@ -1,6 +1,101 @@
-from typing import Dict, List, Any
+import base64
+import json
+from datetime import date
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import and_, func, or_, tuple_
 from sqlalchemy.orm import Session
+from app.db.bulk_writer import BulkWriter
 from app.db.models import UnifiedTransaction, UserTransaction
+from app.parsers.csv_normalizer import promoted_values, search_text
+from app.parsers.dates import parse_date, parse_timestamp, row_time
+from app.services.data_version import DataVersionService
+from app.services.dedupe import row_fingerprint
+from app.services.rollup_service import RollupDelta, RollupService
+
+# Ids are loaded, and new rows inserted, in chunks of this size when saving edits.
+SAVE_CHUNK_SIZE = 1000
+
+# Columns computed from other fields; not returned in listings and never taken from edits.
+DERIVED_FIELDS = {"txn_date", "txn_timestamp", "search_text", "fingerprint"}
+# Columns set only by ingest and never taken from edits; is_duplicate is
+# returned in listings, ingest_id (the upload that wrote the row) is not.
+READ_ONLY_FIELDS = DERIVED_FIELDS | {"is_duplicate", "ingest_id"}
+# Columns returned in listings, in response order; `data` is merged over them.
+# Derived columns and the promoted fields (whose values are already in `data`
+# under their original names) are left out.
+LISTING_COLUMNS = ("id", "date", "amount", "description", "type", "source_file", "is_duplicate")
+
+
+# Sort keys accepted by the listings (prefix with "-" for descending) -> column
+SORT_COLUMNS = {"id": "id", "date": "txn_date", "amount": "amount"}
+
+# Filters answerable from the rollup table, which is grouped by these columns
+ROLLUP_FILTERS = {"type", "source_file"}
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """Split a sort key into (field, descending). Raises ValueError if unknown."""
+    field = sort[1:] if sort.startswith("-") else sort
+    if field not in SORT_COLUMNS:
+        raise ValueError(f"Invalid sort '{sort}'; expected one of {', '.join(SORT_COLUMNS)}")
+    return field, sort.startswith("-")
+
+
+def encode_cursor(last_id: int, sort: str = "id", value: Any = None) -> str:
+    """
+    Encode the position after the last row of a page as an opaque `after`
+    token. For sorts other than id it also carries that row's sort value.
+    """
+    payload: Dict[str, Any] = {"id": last_id}
+    if sort != "id":
+        payload["s"] = sort
+        payload["v"] = value.isoformat() if isinstance(value, date) else value
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str = "id") -> Tuple[int, Any]:
+    """
+    Decode an `after` token into (last id, last sort value). Raises
+    ValueError if it is malformed or was issued for a different sort.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        last_id = int(payload["id"])
+        value = payload.get("v")
+        if value is not None and parse_sort(sort)[0] == "date":
+            value = date.fromisoformat(value)
+    except Exception as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+    if payload.get("s", "id") != sort:
+        raise ValueError("Pagination cursor does not match the sort order")
+    return last_id, value
+
+
+def listing_entities(model) -> List[Any]:
+    """Columns selected for listings: LISTING_COLUMNS followed by `data`."""
+    return [getattr(model, name) for name in LISTING_COLUMNS] + [model.data]
+
+
+def tuple_to_item(values) -> Dict[str, Any]:
+    """
+    Build a response dict from a `listing_entities` tuple in one pass:
+    non-empty columns, then the `data` fields merged over them.
+    """
+    item = {}
+    for name, value in zip(LISTING_COLUMNS, values):
+        if value is not None and value != '':
+            item[name] = value
+    data = values[len(LISTING_COLUMNS)]
+    if data:
+        item.update(data)
+    return item
+
+
+def row_to_item(row) -> Dict[str, Any]:
+    """Flatten a transaction ORM row and its `data` fields into one response dict."""
+    return tuple_to_item([getattr(row, name) for name in LISTING_COLUMNS] + [row.data])
 
 
 class TransactionService:
@@ -9,63 +104,201 @@ class TransactionService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_unified_transactions(self, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    @staticmethod
+    def filter_clauses(model, filters: Optional[Dict[str, Any]]) -> List[Any]:
         """
-        Get paginated unified transactions with merged data fields.
+        Translate listing filters into SQL predicates on indexed columns.
+
+        Supported keys: date_from/date_to (inclusive, on txn_date),
+        amount_min/amount_max (inclusive), and exact matches on type,
+        source_file, student_id and invoice_number. None values are ignored.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        clauses = []
+        if "date_from" in filters:
+            clauses.append(model.txn_date >= filters["date_from"])
+        if "date_to" in filters:
+            clauses.append(model.txn_date <= filters["date_to"])
+        if "amount_min" in filters:
+            clauses.append(model.amount >= filters["amount_min"])
+        if "amount_max" in filters:
+            clauses.append(model.amount <= filters["amount_max"])
+        for field in ("type", "source_file", "student_id", "invoice_number"):
+            if field in filters:
+                clauses.append(getattr(model, field) == filters[field])
+        return clauses
+    
+    @staticmethod
+    def _order_by(model, field: str, descending: bool) -> List[Any]:
         """
-        query = self.db.query(UnifiedTransaction)
-        total = query.count()
-        rows = query.offset((page - 1) * page_size).limit(page_size).all()
+        Sort order with id as tie-breaker. NULL sort values come last when
+        ascending and first when descending, so one index serves both ways.
+        """
+        if field == "id":
+            return [model.id.desc() if descending else model.id.asc()]
+        column = getattr(model, SORT_COLUMNS[field])
+        if descending:
+            return [column.desc().nulls_first(), model.id.desc()]
+        return [column.asc().nulls_last(), model.id.asc()]
+    
+    @staticmethod
+    def _after_clause(model, field: str, descending: bool, last_id: int, value: Any) -> Any:
+        """Keyset predicate for the rows after a cursor in `_order_by` order."""
+        if field == "id":
+            return model.id < last_id if descending else model.id > last_id
+        column = getattr(model, SORT_COLUMNS[field])
+        if descending:
+            if value is None:
+                return or_(and_(column.is_(None), model.id < last_id), column.isnot(None))
+            return tuple_(column, model.id) < tuple_(value, last_id)
+        if value is None:
+            return and_(column.is_(None), model.id > last_id)
+        return or_(tuple_(column, model.id) > tuple_(value, last_id), column.is_(None))
+    
+    def listing_query(
+        self,
+        model,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "id",
+        entities: Optional[List[Any]] = None,
+    ):
+        """
+        Filtered and ordered query behind the listing endpoints; selects the
+        model, or only `entities` when given.
+        """
+        field, descending = parse_sort(sort)
+        return (
+            self.db.query(*(entities or [model]))
+            .filter(*self.filter_clauses(model, filters))
+            .order_by(*self._order_by(model, field, descending))
+        )
+    
+    def _count(self, dataset: str, model, filters: Optional[Dict[str, Any]]) -> int:
+        """
+        Total rows matching the filters. Unfiltered, or filtered only by type
+        and source_file, it is read from the rollup table; otherwise it is a
+        filtered COUNT.
+        """
+        active = {k: v for k, v in (filters or {}).items() if v is not None}
+        if set(active) <= ROLLUP_FILTERS:
+            return RollupService(self.db).count(dataset, active.get("type"), active.get("source_file"))
+        clauses = self.filter_clauses(model, active)
+        return self.db.query(func.count(model.id)).filter(*clauses).scalar() or 0
+    
+    def _list_transactions(
+        self,
+        dataset: str,
+        model,
+        page: int = 1,
+        page_size: int = 20,
+        after: Optional[str] = None,
+        include_total: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "id",
+    ) -> Dict[str, Any]:
+        """
+        Page through a transaction table, filtered and sorted in SQL.
+
+        With `after` (a `next_cursor` from a previous page) the page is found
+        with a keyset predicate on the sort key and id instead of OFFSET, so
+        deep pages cost the same as the first. Raises ValueError for an
+        unknown sort or a bad cursor.
+        """
+        field, descending = parse_sort(sort)
+        # Plain tuples rather than ORM objects; the sort column goes last
+        # when it is not already selected, for the next cursor.
+        entities = listing_entities(model)
+        if field == "date":
+            entities.append(model.txn_date)
+        query = self.listing_query(model, filters, sort, entities)
+        if after:
+            last_id, value = decode_cursor(after, sort)
+            query = query.filter(self._after_clause(model, field, descending, last_id, value))
+        else:
+            query = query.offset((page - 1) * page_size)
+        rows = query.limit(page_size + 1).all()
         
-        result = []
-        for row in rows:
-            base = {
-                k: v for k, v in row.__dict__.items() 
-                if not k.startswith('_') and k != 'metadata' and k != 'data' 
-                and v not in [None, '', []]
-            }
-            
-            data = row.data if row.data else {}
-            merged = {**base, **data}
-            result.append(merged)
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            value = getattr(last, SORT_COLUMNS[field]) if field != "id" else None
+            next_cursor = encode_cursor(last.id, sort, value)
         
-        return {"total": total, "items": result}
+        result = [tuple_to_item(row) for row in rows]
+        
+        total = self._count(dataset, model, filters) if include_total else None
+        return {"total": total, "items": result, "next_cursor": next_cursor}
     
-    def get_org_transactions(self, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    def get_unified_transactions(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        after: Optional[str] = None,
+        include_total: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "id",
+    ) -> Dict[str, Any]:
+        """
+        Get paginated unified transactions with merged data fields.
+        """
+        return self._list_transactions(
+            "unified", UnifiedTransaction, page, page_size, after, include_total, filters, sort
+        )
+    
+    def get_org_transactions(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        after: Optional[str] = None,
+        include_total: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "id",
+    ) -> Dict[str, Any]:
         """
         Get paginated organization transactions with merged data fields.
         """
-        query = self.db.query(UserTransaction)
-        total = query.count()
-        rows = query.offset((page - 1) * page_size).limit(page_size).all()
-        
-        result = []
-        for row in rows:
-            base = {
-                k: v for k, v in row.__dict__.items() 
-                if not k.startswith('_') and k != 'metadata' and k != 'data' 
-                and v not in [None, '', []]
-            }
-            
-            data = row.data if row.data else {}
-            merged = {**base, **data}
-            result.append(merged)
-        
-        return {"total": total, "items": result}
+        return self._list_transactions(
+            "org", UserTransaction, page, page_size, after, include_total, filters, sort
+        )
 
-    def save_unified_transactions(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _save_transactions(self, dataset: str, model, items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Persist edited unified transactions.
+        Persist edited transactions in bulk.
 
-        - Expects a list of flat dicts as returned by get_unified_transactions.
-        - Known base columns are mapped back to model columns.
-        - Any additional fields are stored under the JSON `data` column.
+        Referenced ids are loaded with chunked `IN` queries, changes are applied
+        in memory, and the result is written with one bulk update plus batched
+        inserts instead of a lookup and flush per item.
         """
         if not isinstance(items, list):
             return {"success": False, "message": "Payload must be a list"}
 
         base_fields = {"id", "date", "amount", "description", "type", "source_file"}
+        columns = ["date", "amount", "description", "type", "source_file", "data", "txn_date"]
 
+        ids = set()
+        for item in items:
+            if isinstance(item, dict) and item.get("id"):
+                try:
+                    ids.add(int(item["id"]))
+                except (TypeError, ValueError):
+                    pass
+
+        current: Dict[int, Dict[str, Any]] = {}
+        id_list = sorted(ids)
+        for i in range(0, len(id_list), SAVE_CHUNK_SIZE):
+            chunk = id_list[i:i + SAVE_CHUNK_SIZE]
+            rows = (
+                self.db.query(model.id, *[getattr(model, c) for c in columns])
+                .filter(model.id.in_(chunk))
+                .all()
+            )
+            for row in rows:
+                current[row[0]] = dict(zip(columns, row[1:]))
+
+        updates: Dict[int, Dict[str, Any]] = {}
+        writer = BulkWriter(self.db, model, SAVE_CHUNK_SIZE)
+        delta = RollupDelta()
         updated = 0
         created = 0
 
@@ -76,107 +309,78 @@ class TransactionService:
             txn_id = item.get("id")
 
             base = {k: item.get(k) for k in base_fields if k in item}
-            extras = {k: v for k, v in item.items() if k not in base_fields}
+            extras = {k: v for k, v in item.items() if k not in base_fields and k not in READ_ONLY_FIELDS}
 
             if txn_id:
-                txn = self.db.query(UnifiedTransaction).filter(UnifiedTransaction.id == txn_id).first()
-                if not txn:
+                try:
+                    txn = current.get(int(txn_id))
+                except (TypeError, ValueError):
+                    txn = None
+                if txn is None:
                     continue
-                if "date" in base:
-                    txn.date = base.get("date")
+                delta.remove(txn["type"], txn["source_file"], txn["amount"], txn["txn_date"])
+                for field in ("date", "description", "type", "source_file"):
+                    if field in base:
+                        txn[field] = base.get(field)
                 if "amount" in base:
                     try:
-                        txn.amount = float(base.get("amount")) if base.get("amount") is not None else None
+                        txn["amount"] = float(base.get("amount")) if base.get("amount") is not None else None
                     except Exception:
                         pass
-                if "description" in base:
-                    txn.description = base.get("description")
-                if "type" in base:
-                    txn.type = base.get("type")
-                if "source_file" in base:
-                    txn.source_file = base.get("source_file")
-
-                current_data = txn.data or {}
+
+                current_data = dict(txn["data"] or {})
                 current_data.update(extras)
-                txn.data = current_data if current_data else None
+                txn["data"] = current_data if current_data else None
+                txn["txn_date"] = parse_date(txn["date"])
+                txn["txn_timestamp"] = parse_timestamp(txn["date"], row_time(txn["data"]))
+                txn["search_text"] = search_text(txn["description"], txn["data"])
+                txn.update(promoted_values(txn["data"]))
+                txn["fingerprint"] = row_fingerprint(txn, txn["data"])
+                delta.add(txn["type"], txn["source_file"], txn["amount"], txn["txn_date"])
+                updates[int(txn_id)] = txn
                 updated += 1
             else:
                 try:
                     amount_val = float(base.get("amount")) if base.get("amount") is not None else None
                 except Exception:
                     amount_val = None
-                txn = UnifiedTransaction(
-                    date=base.get("date"),
-                    amount=amount_val,
-                    description=base.get("description"),
-                    type=base.get("type"),
-                    source_file=base.get("source_file"),
-                    data=extras or None,
-                )
-                self.db.add(txn)
+                row = {
+                    "date": base.get("date"),
+                    "amount": amount_val,
+                    "description": base.get("description"),
+                    "type": base.get("type"),
+                    "source_file": base.get("source_file"),
+                    "data": extras or None,
+                    "txn_date": parse_date(base.get("date")),
+                    "txn_timestamp": parse_timestamp(base.get("date"), row_time(extras)),
+                    "search_text": search_text(base.get("description"), extras),
+                    **promoted_values(extras),
+                }
+                row["fingerprint"] = row_fingerprint(row, extras)
+                writer.add(row)
+                delta.add(row["type"], row["source_file"], row["amount"], row["txn_date"])
                 created += 1
 
+        if updates:
+            self.db.bulk_update_mappings(model, [{"id": k, **v} for k, v in updates.items()])
+        writer.flush()
+        RollupService(self.db).apply(dataset, delta)
+        DataVersionService(self.db).bump(dataset)
         self.db.commit()
         return {"success": True, "updated": updated, "created": created}
+
+    def save_unified_transactions(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Persist edited unified transactions.
+
+        - Expects a list of flat dicts as returned by get_unified_transactions.
+        - Known base columns are mapped back to model columns.
+        - Any additional fields are stored under the JSON `data` column.
+        """
+        return self._save_transactions("unified", UnifiedTransaction, items)
     
     def save_org_transactions(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Persist edited organization transactions.
         """
-        if not isinstance(items, list):
-            return {"success": False, "message": "Payload must be a list"}
-
-        base_fields = {"id", "date", "amount", "description", "type", "source_file"}
-
-        updated = 0
-        created = 0
-
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-
-            txn_id = item.get("id")
-
-            base = {k: item.get(k) for k in base_fields if k in item}
-            extras = {k: v for k, v in item.items() if k not in base_fields}
-
-            if txn_id:
-                txn = self.db.query(UserTransaction).filter(UserTransaction.id == txn_id).first()
-                if not txn:
-                    continue
-                if "date" in base:
-                    txn.date = base.get("date")
-                if "amount" in base:
-                    try:
-                        txn.amount = float(base.get("amount")) if base.get("amount") is not None else None
-                    except Exception:
-                        pass
-                if "description" in base:
-                    txn.description = base.get("description")
-                if "type" in base:
-                    txn.type = base.get("type")
-                if "source_file" in base:
-                    txn.source_file = base.get("source_file")
-
-                current_data = txn.data or {}
-                current_data.update(extras)
-                txn.data = current_data if current_data else None
-                updated += 1
-            else:
-                try:
-                    amount_val = float(base.get("amount")) if base.get("amount") is not None else None
-                except Exception:
-                    amount_val = None
-                txn = UserTransaction(
-                    date=base.get("date"),
-                    amount=amount_val,
-                    description=base.get("description"),
-                    type=base.get("type"),
-                    source_file=base.get("source_file"),
-                    data=extras or None,
-                )
-                self.db.add(txn)
-                created += 1
-
-        self.db.commit()
-        return {"success": True, "updated": updated, "created": created}
+        return self._save_transactions("org", UserTransaction, items)
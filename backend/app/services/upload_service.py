@@ -1,131 +1,333 @@
-import csv
+import asyncio
+import hashlib
 import os
-from typing import List, Dict, Any
+import uuid
+from typing import List, Dict, Any, Optional, Callable
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
-from app.db.models import UnifiedTransaction, UserTransaction
-from app.parsers.csv_normalizer import normalize_csv_row
-from app.parsers.mt940_parser import parse_mt940
+from app.db.bulk_writer import BulkWriter
+from app.db.models import UnifiedTransaction, UploadedFile, UserTransaction
+from app.parsers import upload_parser
+from app.parsers.csv_normalizer import promoted_values, search_text
+from app.parsers.dates import parse_date, parse_timestamp, row_time
+from app.parsers.upload_parser import (
+    CSV_EXTENSIONS,
+    MT940_EXTENSIONS,
+    FIXED_KEYS,
+    MT940_EXTRA_KEYS,
+    ParseRejects,
+    Record,
+    file_extension,
+    iter_file_batches,
+)
+from app.services import parse_pool
+from app.services.data_version import DataVersionService
+from app.services.dedupe import DuplicateFilter, row_fingerprint
+from app.services.rollup_service import RollupDelta, RollupService
+
+# Rows are written to the DB in batches of this many rows, so memory depends
+# on this (and the read chunk size), not on file size.
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "5000"))
+
+# replace: clear the dataset; append: add rows; replace_source: replace only
+# the rows of the uploaded filenames
+UPLOAD_MODES = ("replace", "append", "replace_source")
+
+# Upper bound on the rows echoed back in an upload response; the full result
+# is paged from the stored rows by ingest id.
+UPLOAD_PREVIEW_MAX = 1000
+
+
+class IngestReport:
+    """
+    Per-file row counts and a bounded preview for one upload, returned in
+    place of the ingested rows themselves.
+    """
+
+    def __init__(self, ingest_id: str, preview: int = 0):
+        self.ingest_id = ingest_id
+        self.preview_limit = max(0, min(preview, UPLOAD_PREVIEW_MAX))
+        self.preview: List[Dict[str, Any]] = []
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.rejects = ParseRejects()
+
+    def count(self, rows: List[Dict[str, Any]], field: str) -> None:
+        """Add `rows` to the per-source-file `field` count."""
+        for row in rows:
+            counts = self.counts.get(row['source_file'])
+            if counts is None:
+                counts = self.counts[row['source_file']] = {"parsed": 0, "rows": 0}
+            counts[field] += 1
+
+    def add_preview(self, batch: List[Record]) -> None:
+        room = self.preview_limit - len(self.preview)
+        if room > 0:
+            # Normalized data merged with extra fields, as listed
+            self.preview.extend({**norm, **data} for norm, data in batch[:room])
+
+    def summary(self, prints: List[Dict[str, Any]], dedupe: DuplicateFilter) -> Dict[str, Any]:
+        """
+        Per-file and total counts. `rows` were written; `dropped` rows were
+        parsed but not written (duplicates under the skip policy); `rejected`
+        lines could not be parsed into rows at all.
+        """
+        files = []
+        totals = {"parsed": 0, "rows": 0, "duplicates": 0, "dropped": 0, "rejected": 0}
+        for fp in prints:
+            counts = self.counts.get(fp["filename"], {"parsed": 0, "rows": 0})
+            entry = {
+                **counts,
+                "duplicates": dedupe.per_file.get(fp["filename"], 0),
+                "dropped": counts["parsed"] - counts["rows"],
+                "rejected": self.rejects.counts.get(fp["filename"], 0),
+            }
+            for key in totals:
+                totals[key] += entry[key]
+            files.append({**fp, **entry})
+        return {"files": files, "totals": totals}
 
 
 class UploadService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.fixed_keys = {'date', 'amount', 'description', 'type', 'source_file'}
+        self.fixed_keys = FIXED_KEYS
+        self.mt940_extra_keys = MT940_EXTRA_KEYS
+        # Called with the row count of each written batch (used by ingest jobs)
+        self.progress: Optional[Callable[[int], None]] = None
     
     def normalize_mt940_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            'date': row.get('value_date', ''),
-            'amount': row.get('amount', 0.0),
-            'description': row.get('description', ''),
-            'type': row.get('type', ''),
+        return upload_parser.normalize_mt940_row(row)
+    
+    def transaction_row(
+        self, norm: Dict[str, Any], data: Dict[str, Any], ingest_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the column mapping written for one transaction.
+        """
+        date_value = norm.get('date')
+        row = {
+            'date': date_value,
+            'amount': norm.get('amount'),
+            'description': norm.get('description'),
+            'type': norm.get('type'),
+            'source_file': norm.get('source_file'),
+            'data': data if data else None,
+            'txn_date': parse_date(date_value),
+            'txn_timestamp': parse_timestamp(date_value, row_time(norm, data)),
+            'search_text': search_text(norm.get('description'), norm, data),
+            **promoted_values(norm),
+            'is_duplicate': None,
+            'ingest_id': ingest_id,
         }
+        row['fingerprint'] = row_fingerprint(row, data)
+        return row
     
-    async def process_unified_upload(self, files: List[UploadFile]) -> Dict[str, List[Dict]]:
-        # Clear existing data
-        self.db.query(UnifiedTransaction).delete()
-        self.db.commit()
-        
-        all_rows = []
-        
-        for file in files:
-            filename = file.filename
-            content = await file.read()
-            ext = os.path.splitext(filename)[1].lower()
-            
-            if ext in ['.csv']:
-                rows = await self._process_csv_file(content, filename)
-                all_rows.extend(rows)
-            elif ext in ['.txt', '.mt940']:
-                rows = await self._process_mt940_file(content, filename)
-                all_rows.extend(rows)
-        
-        self.db.commit()
-        return {"rows": all_rows}
+    def _ingest_batch(
+        self,
+        batch: List[Record],
+        writer: BulkWriter,
+        delta: RollupDelta,
+        report: IngestReport,
+        dedupe: Optional[DuplicateFilter] = None,
+    ) -> None:
+        """
+        Write one parsed batch and count it in `report`. With `dedupe`,
+        duplicates are flagged or dropped per its policy before writing.
+        """
+        written = [self.transaction_row(norm, data, report.ingest_id) for norm, data in batch]
+        report.count(written, "parsed")
+        if dedupe is not None:
+            keep = dedupe.check(written)
+            if not all(keep):
+                written = [row for row, k in zip(written, keep) if k]
+                batch = [record for record, k in zip(batch, keep) if k]
+        writer.add_many(written)
+        report.count(written, "rows")
+        for row in written:
+            delta.add(row['type'], row['source_file'], row['amount'], row['txn_date'])
+        report.add_preview(batch)
+        if self.progress is not None:
+            self.progress(len(batch))
     
-    async def process_org_upload(self, files: List[UploadFile]) -> Dict[str, List[Dict]]:
-        # Clear existing data
-        self.db.query(UserTransaction).delete()
-        self.db.commit()
-        
-        all_rows = []
+    async def _ingest_files(
+        self,
+        files: List[UploadFile],
+        extensions: tuple,
+        writer: BulkWriter,
+        delta: RollupDelta,
+        statements: List[Dict],
+        report: IngestReport,
+        dedupe: Optional[DuplicateFilter] = None,
+    ) -> None:
+        """
+        Parse the supported files and write their rows in upload order.
+
+        With PARSE_WORKERS > 1 and several files, parsing runs in the process
+        pool while this coroutine awaits each file's result in order and
+        feeds its batches to the single writer.
+        """
+        selected = [f for f in files if file_extension(f.filename) in extensions]
         
+        if parse_pool.PARSE_WORKERS > 1 and len(selected) > 1:
+            pool = parse_pool.get_pool(parse_pool.PARSE_WORKERS)
+            jobs = []
+            try:
+                for file in selected:
+                    path = parse_pool.spool_to_disk(file.file, file_extension(file.filename))
+                    jobs.append((path, pool.submit(parse_pool.parse_to_spool, path, file.filename, UPLOAD_BATCH_SIZE)))
+
+                for path, future in jobs:
+                    spool_path, file_statements, file_rejects = await asyncio.wrap_future(future)
+                    os.remove(path)
+                    statements.extend(file_statements)
+                    report.rejects.merge(file_rejects)
+                    for batch in parse_pool.iter_spooled_batches(spool_path):
+                        self._ingest_batch(batch, writer, delta, report, dedupe)
+            finally:
+                # On failure, stop queued parses and wait out running ones
+                # before removing what they read and wrote
+                for _, future in jobs:
+                    future.cancel()
+                if jobs:
+                    await asyncio.wait([asyncio.wrap_future(future) for _, future in jobs])
+                for path, _ in jobs:
+                    parse_pool.discard(path)
+        else:
+            for file in selected:
+                await file.seek(0)
+                for batch in iter_file_batches(
+                    file.file, file.filename, UPLOAD_BATCH_SIZE, statements, report.rejects
+                ):
+                    self._ingest_batch(batch, writer, delta, report, dedupe)
+    
+    def _fingerprint_files(self, files: List[UploadFile]) -> List[Dict[str, Any]]:
+        """SHA-256 and size of each upload, read in chunks."""
+        prints = []
         for file in files:
-            filename = file.filename
-            content = await file.read()
-            ext = os.path.splitext(filename)[1].lower()
-            
-            if ext in ['.csv']:
-                rows = await self._process_csv_file(content, filename, use_user_transaction=True)
-                all_rows.extend(rows)
-        
-        self.db.commit()
-        return {"rows": all_rows}
+            digest = hashlib.sha256()
+            size = 0
+            file.file.seek(0)
+            for chunk in iter(lambda: file.file.read(upload_parser.UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+            file.file.seek(0)
+            prints.append({"filename": file.filename, "sha256": digest.hexdigest(), "size": size})
+        return prints
     
-    async def _process_csv_file(self, content: bytes, filename: str, use_user_transaction: bool = False) -> List[Dict]:
-        decoded = content.decode()
-        reader = csv.DictReader(decoded.splitlines())
-        rows = []
+    async def _process_upload(
+        self,
+        dataset: str,
+        model,
+        files: List[UploadFile],
+        extensions: tuple,
+        preview: int,
+        duplicates: str,
+        mode: str,
+        statements: List[Dict],
+        ingest_id: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        Ingest uploaded files into a dataset.
+
+        - `replace` clears the table first (the original behaviour).
+        - `append` adds rows to what is there.
+        - `replace_source` deletes only the rows whose source_file matches an
+          uploaded filename, in the same transaction as the new rows.
+
+        In the last two modes a file whose SHA-256 is already recorded for the
+        dataset is skipped without being parsed.
+
+        Rows are tagged with `ingest_id` (a new id if not given) so the full
+        result can be paged from the table later; the response carries only
+        counts and the first `preview` rows.
+        """
+        if mode not in UPLOAD_MODES:
+            raise ValueError(f"Invalid upload mode '{mode}'; expected one of {', '.join(UPLOAD_MODES)}")
+        rollups = RollupService(self.db)
+        # After a full clear only rows within this upload can collide
+        dedupe = DuplicateFilter(self.db, model, duplicates, check_existing=mode != "replace")
         
-        for row in reader:
-            norm = normalize_csv_row(row)
-            norm['source_file'] = filename
-            
-            # Separate extra fields
-            data = {k: v for k, v in row.items() 
-                   if k not in self.fixed_keys and v not in [None, '', []]}
-            
-            # Create transaction record
-            if use_user_transaction:
-                transaction = UserTransaction(
-                    date=norm.get('date'),
-                    amount=norm.get('amount'),
-                    description=norm.get('description'),
-                    type=norm.get('type'),
-                    source_file=norm.get('source_file'),
-                    data=data if data else None
-                )
-            else:
-                transaction = UnifiedTransaction(
-                    date=norm.get('date'),
-                    amount=norm.get('amount'),
-                    description=norm.get('description'),
-                    type=norm.get('type'),
-                    source_file=norm.get('source_file'),
-                    data=data if data else None
+        files = [f for f in files if file_extension(f.filename) in extensions]
+        prints = self._fingerprint_files(files)
+        skipped = []
+        
+        if mode == "replace":
+            # Clear existing data
+            self.db.query(model).delete()
+            self.db.query(UploadedFile).filter(UploadedFile.dataset == dataset).delete(synchronize_session=False)
+            rollups.reset(dataset)
+            DataVersionService(self.db).bump(dataset)
+            self.db.commit()
+        else:
+            known = {
+                sha for (sha,) in self.db.query(UploadedFile.sha256).filter(
+                    UploadedFile.dataset == dataset,
+                    UploadedFile.sha256.in_([p["sha256"] for p in prints]),
                 )
-            
-            self.db.add(transaction)
-            
-            # Merge normalized data with extra fields for response
-            merged = {**norm, **data}
-            rows.append(merged)
+            }
+            selected = []
+            for file, fp in zip(files, prints):
+                if fp["sha256"] in known:
+                    skipped.append({**fp, "reason": "identical file already ingested"})
+                    continue
+                known.add(fp["sha256"])
+                selected.append((file, fp))
+            files = [file for file, _ in selected]
+            prints = [fp for _, fp in selected]
         
-        return rows
-    
-    async def _process_mt940_file(self, content: bytes, filename: str) -> List[Dict]:
-        try:
-            parsed = parse_mt940(content.decode())
-        except Exception:
-            return []
+        if mode == "replace_source":
+            for fp in prints:
+                self.db.query(model).filter(model.source_file == fp["filename"]).delete(synchronize_session=False)
+                self.db.query(UploadedFile).filter(
+                    UploadedFile.dataset == dataset, UploadedFile.filename == fp["filename"]
+                ).delete(synchronize_session=False)
+                rollups.reset_source(dataset, fp["filename"])
         
-        rows = []
-        for row in parsed:
-            norm = self.normalize_mt940_row(row)
-            norm['source_file'] = filename
-            
-            # Create transaction record
-            transaction = UnifiedTransaction(
-                date=norm.get('date'),
-                amount=norm.get('amount'),
-                description=norm.get('description'),
-                type=norm.get('type'),
-                source_file=norm.get('source_file'),
-                data=None
-            )
-            
-            self.db.add(transaction)
-            rows.append(norm)
+        writer = BulkWriter(self.db, model, UPLOAD_BATCH_SIZE)
+        delta = RollupDelta()
+        report = IngestReport(ingest_id or uuid.uuid4().hex, preview)
+        await self._ingest_files(files, extensions, writer, delta, statements, report, dedupe)
         
-        return rows
+        writer.flush()
+        rollups.apply(dataset, delta)
+        self.db.add_all(UploadedFile(dataset=dataset, **fp) for fp in prints)
+        DataVersionService(self.db).bump(dataset)
+        self.db.commit()
+        return {
+            "ingest_id": report.ingest_id,
+            "mode": mode,
+            **report.summary(prints, dedupe),
+            "skipped_files": skipped,
+            "duplicates": dedupe.summary(),
+            "parse_rejects": report.rejects.summary(),
+            "ingest_stats": writer.stats(),
+            "preview": report.preview,
+        }
+    
+    async def process_unified_upload(
+        self,
+        files: List[UploadFile],
+        preview: int = 0,
+        duplicates: str = "flag",
+        mode: str = "replace",
+        ingest_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        statements = []
+        result = await self._process_upload(
+            "unified", UnifiedTransaction, files, CSV_EXTENSIONS + MT940_EXTENSIONS,
+            preview, duplicates, mode, statements, ingest_id,
+        )
+        return {**result, "statements": statements}
+    
+    async def process_org_upload(
+        self,
+        files: List[UploadFile],
+        preview: int = 0,
+        duplicates: str = "flag",
+        mode: str = "replace",
+        ingest_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return await self._process_upload(
+            "org", UserTransaction, files, CSV_EXTENSIONS, preview, duplicates, mode, [], ingest_id,
+        )
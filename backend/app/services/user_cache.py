@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.db.models import User
+
+# Seconds a resolved user stays cached; 0 disables the cache. Invalidation
+# on user changes is per process, so with several workers this also bounds
+# how long other workers can serve a stale user.
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+
+_FIELDS = ("id", "email", "is_superuser", "is_active")
+
+
+class UserCache:
+    """
+    TTL + LRU cache of authenticated users, keyed by token subject (email).
+
+    Entries are plain snapshots of the user's columns, returned as fresh
+    transient `User` objects, so they never depend on a closed session.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_size: int = AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Tuple[Optional[User], int]:
+        """
+        Return the cached user (or None) and the cache generation. Pass the
+        generation to `put` so a lookup that raced an invalidation is dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(email)
+                self.hits += 1
+                return User(**entry[1]), self._generation
+            if entry is not None:
+                del self._entries[email]
+            self.misses += 1
+            return None, self._generation
+
+    def put(self, user: User, generation: int) -> None:
+        if self.ttl <= 0:
+            return
+        snapshot = {field: getattr(user, field) for field in _FIELDS}
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user.email] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user.email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl,
+            }
+
+
+user_cache = UserCache()
@@ -0,0 +1,31 @@
+"""
+Backfill of the columns derived at ingest for existing rows.
+
+Adds any missing columns and indexes, then recomputes txn_date /
+txn_timestamp, search_text, the promoted `data` fields and the fingerprint
+of every row in committed batches, and rebuilds the per-day rollups from the
+new dates. Safe to rerun.
+Run: python backfill_columns.py [batch_size]
+"""
+import sys
+from app.db.database import Base, SessionLocal, engine
+from app.db.migrations import backfill_transaction_columns, upgrade_schema
+from app.services.rollup_service import DATASETS, RollupService
+
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    Base.metadata.create_all(bind=engine)
+    for change in upgrade_schema(engine):
+        print(f"Applied: {change}")
+
+    db = SessionLocal()
+    try:
+        for dataset, model in DATASETS.items():
+            updated = backfill_transaction_columns(db, model, batch_size)
+            print(f"{dataset}: backfilled {updated} rows")
+            RollupService(db).rebuild_daily(dataset)
+            db.commit()
+    finally:
+        db.close()
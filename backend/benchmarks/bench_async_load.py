@@ -0,0 +1,116 @@
+"""
+Read-endpoint load benchmark: sync routes vs the async data layer.
+
+Seeds the benchmark database, then starts uvicorn once with USE_ASYNC_DB off
+and once with it on, and drives the dashboard read endpoints with
+`concurrency` simultaneous clients for `requests` requests in total. Prints
+throughput, latency percentiles and errors for each mode. Needs httpx and
+the async driver for the database (aiosqlite or asyncpg).
+Run: python -m benchmarks.bench_async_load [rows] [concurrency] [requests]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks import common
+from app.db.database import SessionLocal
+from app.services.auth_service import create_access_token, create_user
+from app.services.rollup_service import RollupService
+from app.services.upload_service import UploadService
+
+PORT = int(os.getenv("BENCH_PORT", "8765"))
+ENDPOINTS = [
+    "/unified_transactions?page=1&page_size=20",
+    "/unified_transactions?page=50&page_size=20&include_total=false",
+    "/unified_summary",
+    "/unified_pie_type",
+    "/unified_bar_source",
+]
+
+
+def seed(rows: int) -> str:
+    common.reset_db()
+    path = common.generate_csv(rows)
+    db = SessionLocal()
+    try:
+        common.run_async(UploadService(db).process_unified_upload([common.open_upload(path)]))
+        RollupService(db).ensure_built()
+        user = create_user(db, "bench@example.com", "bench-password")
+        return create_access_token({"sub": user.email})
+    finally:
+        db.close()
+
+
+def start_server(use_async: bool) -> subprocess.Popen:
+    env = dict(os.environ, USE_ASYNC_DB="true" if use_async else "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("server did not start")
+
+
+async def drive(token: str, concurrency: int, total: int):
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for i in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(ENDPOINTS[i % len(ENDPOINTS)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, sorted(latencies), errors
+
+
+def report(label: str, elapsed: float, latencies, errors: int) -> None:
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(
+        f"{label:<6} {len(latencies) / elapsed:>9,.0f} req/s  p50 {pct(0.50):7.1f} ms  "
+        f"p95 {pct(0.95):7.1f} ms  p99 {pct(0.99):7.1f} ms  errors {errors}"
+    )
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    total = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+
+    token = seed(rows)
+    print(f"{rows:,} rows, {concurrency} concurrent clients, {total:,} requests")
+    for label, use_async in (("sync", False), ("async", True)):
+        server = start_server(use_async)
+        try:
+            report(label, *asyncio.run(drive(token, concurrency, total)))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Bulk insert benchmark: ORM `db.add()` per row vs. BulkWriter batches.
+
+BulkWriter uses COPY on PostgreSQL/psycopg2 (set BENCH_DATABASE_URL) and
+Core executemany elsewhere.
+Run: python -m benchmarks.bench_bulk_insert [rows] [batch_size]
+"""
+import random
+import sys
+
+from benchmarks import common
+from app.db.bulk_writer import BulkWriter
+from app.db.database import SessionLocal
+from app.db.models import UnifiedTransaction
+
+
+def make_rows(count: int):
+    rng = random.Random(7)
+    for i in range(count):
+        values = common.make_csv_row(i, rng)
+        yield {
+            "date": values[0],
+            "amount": float(values[2]),
+            "description": values[15],
+            "type": values[11],
+            "source_file": "bench.csv",
+            "data": dict(zip(common.CSV_HEADER, values)),
+        }
+
+
+def insert_orm(count: int) -> None:
+    db = SessionLocal()
+    try:
+        for row in make_rows(count):
+            db.add(UnifiedTransaction(**row))
+        db.commit()
+    finally:
+        db.close()
+
+
+def insert_bulk(count: int, batch_size: int) -> None:
+    db = SessionLocal()
+    try:
+        writer = BulkWriter(db, UnifiedTransaction, batch_size)
+        for row in make_rows(count):
+            writer.add(row)
+        writer.flush()
+        db.commit()
+        timings = [t["seconds"] for t in writer.batch_timings]
+        print(
+            f"  {len(timings)} batches via {writer.batch_timings[0]['method']}: "
+            f"min {min(timings):.4f}s  max {max(timings):.4f}s  "
+            f"mean {sum(timings) / len(timings):.4f}s"
+        )
+    finally:
+        db.close()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    common.reset_db()
+    orm = common.measure("orm add()", lambda: insert_orm(rows), rows)
+    common.reset_db()
+    bulk = common.measure(f"bulk writer (batch={batch_size})", lambda: insert_bulk(rows, batch_size), rows)
+    print(f"speedup: {orm['seconds'] / bulk['seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
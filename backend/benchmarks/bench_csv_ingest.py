@@ -0,0 +1,91 @@
+"""
+CSV ingest benchmark: whole-file read vs. streaming chunked ingest vs.
+pandas vectorized ingest.
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+Run: python -m benchmarks.bench_csv_ingest [rows] [mode]
+"""
+import csv
+import subprocess
+import sys
+
+from benchmarks import common
+from app.db.bulk_writer import BulkWriter
+from app.db.database import SessionLocal
+from app.db.models import UnifiedTransaction
+from app.parsers.csv_normalizer import normalize_csv_row
+from app.parsers import upload_parser
+from app.parsers.upload_parser import iter_csv_batches, iter_csv_vectorized_batches
+from app.services.rollup_service import RollupDelta
+from app.services.upload_service import UploadService, UPLOAD_BATCH_SIZE
+
+
+def ingest_legacy(path: str) -> None:
+    """The original path: read, decode and split the whole file up front."""
+    db = SessionLocal()
+    fixed_keys = {'date', 'amount', 'description', 'type', 'source_file'}
+    try:
+        with open(path, "rb") as fh:
+            content = fh.read()
+        reader = csv.DictReader(content.decode().splitlines())
+        for row in reader:
+            norm = normalize_csv_row(row)
+            data = {k: v for k, v in row.items() if k not in fixed_keys and v not in [None, '', []]}
+            db.add(UnifiedTransaction(
+                date=norm["date"], amount=norm["amount"], description=norm["description"],
+                type=norm["type"], source_file="bench.csv", data=data or None,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def ingest_streaming(path: str) -> None:
+    # Keep large files on the row-at-a-time path
+    upload_parser.VECTORIZED_CSV_MIN_BYTES = float("inf")
+    db = SessionLocal()
+    try:
+        service = UploadService(db)
+        writer = BulkWriter(db, UnifiedTransaction, UPLOAD_BATCH_SIZE)
+        delta = RollupDelta()
+        with open(path, "rb") as fh:
+            for batch in iter_csv_batches(fh, "bench.csv", UPLOAD_BATCH_SIZE):
+                service._ingest_batch(batch, writer, delta)
+        writer.flush()
+        db.commit()
+    finally:
+        db.close()
+
+
+def ingest_vectorized(path: str) -> None:
+    db = SessionLocal()
+    try:
+        service = UploadService(db)
+        writer = BulkWriter(db, UnifiedTransaction, UPLOAD_BATCH_SIZE)
+        delta = RollupDelta()
+        with open(path, "rb") as fh:
+            for batch in iter_csv_vectorized_batches(fh, "bench.csv"):
+                service._ingest_batch(batch, writer, delta)
+        writer.flush()
+        db.commit()
+    finally:
+        db.close()
+
+
+MODES = {"legacy": ingest_legacy, "streaming": ingest_streaming, "vectorized": ingest_vectorized}
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    if len(sys.argv) > 2:
+        mode = sys.argv[2]
+        common.reset_db()
+        path = common.generate_csv(rows)
+        common.measure(f"csv ingest [{mode}]", lambda: MODES[mode](path), rows)
+        return
+    for mode in MODES:
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_csv_ingest", str(rows), mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Micro-benchmark: normalize_csv_row on DictReader rows vs. a compiled HeaderPlan
+on csv.reader rows. Also checks that both produce identical output.
+Run: python -m benchmarks.bench_csv_normalizer [rows]
+"""
+import random
+import sys
+import timeit
+
+from benchmarks import common
+from app.parsers.csv_normalizer import compile_header_plan, normalize_csv_row
+
+FIXED_KEYS = {'date', 'amount', 'description', 'type', 'source_file'}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(3)
+    value_rows = [common.make_csv_row(i, rng) for i in range(count)]
+    dict_rows = [dict(zip(common.CSV_HEADER, values)) for values in value_rows]
+
+    def per_row():
+        for row in dict_rows:
+            normalize_csv_row(row)
+            {k: v for k, v in row.items() if k not in FIXED_KEYS and v not in [None, '', []]}
+
+    def planned():
+        plan = compile_header_plan(common.CSV_HEADER, exclude=FIXED_KEYS)
+        for values in value_rows:
+            plan.normalize(values)
+            plan.extras(values)
+
+    plan = compile_header_plan(common.CSV_HEADER, exclude=FIXED_KEYS)
+    for row, values in zip(dict_rows[:1000], value_rows[:1000]):
+        assert normalize_csv_row(row) == plan.normalize(values)
+
+    compile_time = timeit.timeit(lambda: compile_header_plan(common.CSV_HEADER, FIXED_KEYS), number=1000) / 1000
+    print(f"compile_header_plan: {compile_time * 1e6:.1f} us per header")
+    for label, fn in (("normalize_csv_row + extras", per_row), ("HeaderPlan", planned)):
+        best = min(timeit.repeat(fn, number=1, repeat=3))
+        print(f"{label:<28} {count:>9,} rows  {best:7.3f}s  {count / best:>12,.0f} rows/s  "
+              f"{best / count * 1e6:6.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Export benchmark: stream a loaded dataset as CSV, gzipped CSV and NDJSON.
+
+Consumes the same chunk iterator the /unified_export endpoint streams and
+reports throughput, output size and peak RSS. The dataset is loaded in this
+process and each export runs in its own subprocess against the same
+database, so its peak RSS is not the upload's high-water mark. Peak RSS
+should stay flat as `rows` grows, since rows are read through a server-side
+cursor and encoded a batch at a time.
+Run: python -m benchmarks.bench_export [rows] [format]
+"""
+import os
+import subprocess
+import sys
+
+from benchmarks import common
+from app.db.database import SessionLocal
+from app.services.export_service import ExportService
+from app.services.upload_service import UploadService
+
+# format -> (export format, gzip)
+FORMATS = {
+    "csv": ("csv", False),
+    "csv.gz": ("csv", True),
+    "ndjson": ("ndjson", False),
+}
+
+
+def consume(fmt: str, compress: bool, sizes: dict) -> None:
+    db = SessionLocal()
+    try:
+        chunks, _, filename = ExportService(db).export("unified", fmt, compress=compress)
+        sizes[filename] = sum(len(chunk) for chunk in chunks)
+    finally:
+        db.close()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    if len(sys.argv) > 2:
+        fmt, compress = FORMATS[sys.argv[2]]
+        sizes = {}
+        common.measure(f"export {sys.argv[2]}", lambda: consume(fmt, compress, sizes), rows)
+        for filename, size in sizes.items():
+            print(f"{filename:<32} {size / (1024 * 1024):10.1f} MB")
+        return
+
+    path = common.generate_csv(rows)
+    common.reset_db()
+    upload = common.open_upload(path)
+    db = SessionLocal()
+    try:
+        common.run_async(UploadService(db).process_unified_upload([upload]))
+    finally:
+        db.close()
+        upload.file.close()
+    print(f"peak RSS of load: {common.peak_rss_mb():.1f} MB")
+
+    # Point the subprocesses at the database loaded above
+    env = {**os.environ, "BENCH_DATABASE_URL": os.environ["DATABASE_URL"]}
+    for name in FORMATS:
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_export", str(rows), name], check=True, env=env)
+
+
+if __name__ == "__main__":
+    main()
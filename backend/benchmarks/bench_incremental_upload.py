@@ -0,0 +1,54 @@
+"""
+Incremental upload benchmark: adding one month to a loaded history.
+
+Loads `months` monthly CSVs of `rows` rows, then adds one more month three
+ways: replace (re-uploading the whole history), append, and replace_source
+(re-uploading a revised copy of just the new file, under the same name).
+Finally it re-sends that revised file in append mode, which is skipped by its
+SHA-256 without being parsed.
+Run: python -m benchmarks.bench_incremental_upload [months] [rows]
+"""
+import os
+import sys
+
+from benchmarks import common
+from app.db.database import SessionLocal
+from app.services.upload_service import UploadService
+
+
+def upload(paths, mode: str) -> dict:
+    uploads = [common.open_upload(path) for path in paths]
+    db = SessionLocal()
+    try:
+        return common.run_async(UploadService(db).process_unified_upload(uploads, mode=mode))
+    finally:
+        db.close()
+        for upload_file in uploads:
+            upload_file.file.close()
+
+
+def main() -> None:
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    history = [common.generate_csv(rows, name=f"month_{i:02d}.csv", seed=i) for i in range(months)]
+    new_month = common.generate_csv(rows, name=f"month_{months:02d}.csv", seed=months)
+    # Same filename, different content, so replace_source is not skipped by SHA
+    os.makedirs(os.path.join(common.workdir(), "revised"), exist_ok=True)
+    revised_month = common.generate_csv(rows, name=os.path.join("revised", f"month_{months:02d}.csv"), seed=-months - 1)
+    common.reset_db()
+
+    upload(history, "replace")
+    common.measure("replace: full history + new month", lambda: upload(history + [new_month], "replace"), (months + 1) * rows)
+
+    upload(history, "replace")
+    common.measure("append: new month", lambda: upload([new_month], "append"), rows)
+    common.measure("replace_source: revised new month", lambda: upload([revised_month], "replace_source"), rows)
+
+    result = {}
+    common.measure("append: identical file (skipped)", lambda: result.update(upload([revised_month], "append")), rows)
+    print(f"skipped files: {[f['filename'] for f in result['skipped_files']]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Listing serialization benchmark: time per 1,000 rows to build and render a
+transactions page.
+
+old: ORM objects, items built from `row.__dict__`, rendered through
+     `jsonable_encoder` and the default JSONResponse (what the routes did).
+new: `TransactionService.get_unified_transactions` (column tuples, one-pass
+     items) rendered with FastJSONResponse (orjson when installed).
+
+Both walk the whole table in 1,000-row keyset pages; the rendered bodies are
+checked to decode to the same items.
+Run: python -m benchmarks.bench_list_serialization [rows]
+"""
+import json
+import sys
+import time
+
+from benchmarks import common
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.api import responses
+from app.api.responses import FastJSONResponse
+from app.db.database import SessionLocal
+from app.db.models import UnifiedTransaction
+from app.services.transaction_service import READ_ONLY_FIELDS, TransactionService
+from app.services.upload_service import UploadService
+from app.parsers.csv_normalizer import PROMOTED_FIELDS
+
+PAGE_SIZE = 1000
+HIDDEN = READ_ONLY_FIELDS | set(PROMOTED_FIELDS)
+
+
+def legacy_item(row):
+    base = {
+        k: v for k, v in row.__dict__.items()
+        if not k.startswith('_') and k != 'metadata' and k != 'data'
+        and k not in HIDDEN and v not in [None, '', []]
+    }
+    data = row.data if row.data else {}
+    return {**base, **data}
+
+
+def old_pages(db, timings):
+    last_id = 0
+    while True:
+        start = time.perf_counter()
+        rows = (
+            db.query(UnifiedTransaction)
+            .filter(UnifiedTransaction.id > last_id)
+            .order_by(UnifiedTransaction.id)
+            .limit(PAGE_SIZE + 1)
+            .all()
+        )
+        more = len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+        page = {"total": None, "items": [legacy_item(row) for row in rows], "next_cursor": None}
+        built = time.perf_counter()
+        body = JSONResponse(jsonable_encoder(page)).body
+        timings["build"] += built - start
+        timings["render"] += time.perf_counter() - built
+        yield body
+        db.expunge_all()
+        if not more:
+            return
+        last_id = rows[-1].id
+
+
+def new_pages(db, timings):
+    service = TransactionService(db)
+    after = None
+    while True:
+        start = time.perf_counter()
+        page = service.get_unified_transactions(1, PAGE_SIZE, after, include_total=False)
+        built = time.perf_counter()
+        body = FastJSONResponse(page).body
+        timings["build"] += built - start
+        timings["render"] += time.perf_counter() - built
+        yield body
+        after = page["next_cursor"]
+        if after is None:
+            return
+
+
+def run(label, pages, rows):
+    timings = {"build": 0.0, "render": 0.0}
+    db = SessionLocal()
+    try:
+        bodies = list(pages(db, timings))
+    finally:
+        db.close()
+    per_k = {k: v / rows * 1000 * 1000 for k, v in timings.items()}
+    print(
+        f"{label:<6} query+build {per_k['build']:7.2f} ms  render {per_k['render']:7.2f} ms  "
+        f"total {per_k['build'] + per_k['render']:7.2f} ms  per 1,000 rows"
+    )
+    return bodies
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path = common.generate_csv(rows)
+    common.reset_db()
+    upload = common.open_upload(path)
+    db = SessionLocal()
+    try:
+        common.run_async(UploadService(db).process_unified_upload([upload]))
+    finally:
+        db.close()
+        upload.file.close()
+
+    print(f"orjson: {'yes' if responses.orjson is not None else 'no (json fallback)'}")
+    old = run("old", old_pages, rows)
+    new = run("new", new_pages, rows)
+    assert len(old) == len(new)
+    for a, b in zip(old, new):
+        assert json.loads(a)["items"] == json.loads(b)["items"]
+
+
+if __name__ == "__main__":
+    main()
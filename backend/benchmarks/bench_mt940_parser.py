@@ -0,0 +1,66 @@
+"""
+MT940 parser benchmark: the original whole-string parser vs. the streaming
+parser, in lines/sec and peak RSS (each mode runs in its own subprocess).
+Run: python -m benchmarks.bench_mt940_parser [transactions] [mode]
+"""
+import re
+import subprocess
+import sys
+import time
+
+from benchmarks import common
+from app.parsers.mt940_parser import iter_mt940
+
+
+def parse_legacy(content: str):
+    """The original parser: whole file as one string, first :86: line only."""
+    transactions = []
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith(":61:"):
+            match = re.match(r":61:(\d{6})(\d{4})?([CD])([\d,]+)", line)
+            if match:
+                transactions.append({
+                    "value_date": match.group(1),
+                    "entry_date": match.group(2) or "",
+                    "type": "credit" if match.group(3) == "C" else "debit",
+                    "amount": float(match.group(4).replace(",", ".")),
+                    "description": "",
+                })
+        elif line.startswith(":86:") and transactions:
+            transactions[-1]["description"] = line[4:].strip()
+    return transactions
+
+
+def run_legacy(path: str) -> int:
+    with open(path, "rb") as fh:
+        return len(parse_legacy(fh.read().decode()))
+
+
+def run_streaming(path: str) -> int:
+    with open(path, "rb") as fh:
+        return sum(1 for kind, _ in iter_mt940(fh) if kind == "transaction")
+
+
+MODES = {"legacy": run_legacy, "streaming": run_streaming}
+
+
+def main() -> None:
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    if len(sys.argv) > 2:
+        mode = sys.argv[2]
+        path = common.generate_mt940(transactions)
+        with open(path, "rb") as fh:
+            lines = sum(1 for _ in fh)
+        start = time.perf_counter()
+        parsed = MODES[mode](path)
+        elapsed = time.perf_counter() - start
+        print(f"mt940 [{mode:<9}] {lines:>10,} lines  {parsed:>9,} txns  {elapsed:7.2f}s  "
+              f"{lines / elapsed:>12,.0f} lines/s  peak RSS {common.peak_rss_mb():8.1f} MB")
+        return
+    for mode in MODES:
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_mt940_parser", str(transactions), mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
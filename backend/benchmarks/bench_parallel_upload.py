@@ -0,0 +1,63 @@
+"""
+Multi-file upload benchmark: scaling of parse-pool workers from 1 to N.
+
+Generates `files` CSVs of `rows` rows each. For each worker count it times
+parsing alone (all files through the pool) and the full unified upload
+(parsing plus the single DB writer).
+Run: python -m benchmarks.bench_parallel_upload [files] [rows] [max_workers]
+"""
+import os
+import sys
+
+from benchmarks import common
+from app.db.database import SessionLocal
+from app.services import parse_pool
+from app.services.upload_service import UploadService, UPLOAD_BATCH_SIZE
+
+
+def parse_only(paths, workers: int) -> None:
+    if workers <= 1:
+        for path in paths:
+            spool, _, _ = parse_pool.parse_to_spool(path, os.path.basename(path), UPLOAD_BATCH_SIZE)
+            os.remove(spool)
+        return
+    pool = parse_pool.get_pool(workers)
+    futures = [
+        pool.submit(parse_pool.parse_to_spool, path, os.path.basename(path), UPLOAD_BATCH_SIZE)
+        for path in paths
+    ]
+    for future in futures:
+        spool, _, _ = future.result()
+        os.remove(spool)
+
+
+def full_upload(paths, workers: int) -> None:
+    parse_pool.PARSE_WORKERS = workers
+    uploads = [common.open_upload(path) for path in paths]
+    db = SessionLocal()
+    try:
+        common.run_async(UploadService(db).process_unified_upload(uploads))
+    finally:
+        db.close()
+        for upload in uploads:
+            upload.file.close()
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    paths = [common.generate_csv(rows, name=f"month_{i:02d}.csv", seed=i) for i in range(files)]
+    common.reset_db()
+    total = files * rows
+
+    workers = 1
+    while workers <= max_workers:
+        common.measure(f"parse only, {workers} worker(s)", lambda: parse_only(paths, workers), total)
+        common.measure(f"full upload, {workers} worker(s)", lambda: full_upload(paths, workers), total)
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Reconciliation benchmark: in-memory matching, then a full persisted run.
+
+Builds `rows` bank records and as many org records: half share an invoice
+number with their bank row, the rest differ by up to two days and must be
+paired on amount and date. Times `match_records` alone, on distinct amounts
+and on a handful of repeated fixed fees (many same-amount candidates per
+date window), then a complete `ReconciliationService.run` (load, match,
+persist) on `db_rows` rows.
+Run: python -m benchmarks.bench_reconciliation [rows] [db_rows]
+"""
+import random
+import sys
+from datetime import date
+
+from benchmarks import common
+from app.db.bulk_writer import BulkWriter
+from app.db.database import SessionLocal
+from app.db.models import UnifiedTransaction, UserTransaction
+from app.services.reconciliation_service import ReconciliationService, match_records
+
+START = date(2025, 1, 1)
+FIXED_FEES = (5000.0, 15000.0, 25000.0)
+
+
+def make_records(rows: int, seed: int = 42, fees=None, days: int = 365):
+    """Bank and org records; amounts drawn from `fees` if given, else distinct."""
+    rng = random.Random(seed)
+    bank, org = [], []
+    for i in range(rows):
+        amount = rng.choice(fees) if fees else float(rng.randint(1000, 200000))
+        day = START.toordinal() + rng.randint(0, days - 1)
+        invoice = f"INV-{i:09d}" if i % 2 == 0 else None
+        bank.append((i + 1, amount, day, invoice, None))
+        org.append((i + 1, amount, day + rng.randint(-2, 2), invoice, None))
+    rng.shuffle(org)
+    return bank, org
+
+
+def load_db(bank, org) -> None:
+    common.reset_db()
+    db = SessionLocal()
+    try:
+        for model, records in ((UnifiedTransaction, bank), (UserTransaction, org)):
+            writer = BulkWriter(db, model)
+            writer.add_many([
+                {
+                    "id": txn_id,
+                    "amount": amount,
+                    "txn_date": date.fromordinal(day),
+                    "date": date.fromordinal(day).isoformat(),
+                    "invoice_number": invoice,
+                }
+                for txn_id, amount, day, invoice, _ in records
+            ])
+            writer.flush()
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    db_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    bank, org = make_records(rows)
+    common.measure("match_records (in memory)", lambda: match_records(bank, org), rows)
+    bank, org = make_records(rows, fees=FIXED_FEES, days=30)
+    common.measure("match_records (fixed fees)", lambda: match_records(bank, org), rows)
+
+    bank, org = make_records(db_rows)
+    load_db(bank, org)
+    db = SessionLocal()
+    try:
+        run = {}
+        common.measure("reconciliation run (persisted)", lambda: run.update(ReconciliationService(db).run()), db_rows)
+        print(run["summary"])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
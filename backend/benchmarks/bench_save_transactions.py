@@ -0,0 +1,74 @@
+"""
+Edit-save benchmark: per-row lookups vs. the batched save path.
+
+For each size, the table is seeded with that many rows and every row is
+saved back with a changed amount and one extra field.
+Run: python -m benchmarks.bench_save_transactions [sizes...]
+"""
+import sys
+
+from benchmarks import common
+from app.db.bulk_writer import BulkWriter
+from app.db.database import SessionLocal
+from app.db.models import UnifiedTransaction
+from app.services.rollup_service import RollupService
+from app.services.transaction_service import TransactionService
+
+
+def seed(count: int) -> None:
+    common.reset_db()
+    db = SessionLocal()
+    try:
+        writer = BulkWriter(db, UnifiedTransaction)
+        for i in range(count):
+            writer.add({
+                "date": "2025-01-01", "amount": float(i), "description": f"row {i}",
+                "type": "credit", "source_file": "seed.csv", "data": {"Remarks": "seed"},
+            })
+        writer.flush()
+        RollupService(db).rebuild("unified")
+        db.commit()
+    finally:
+        db.close()
+
+
+def edits(count: int):
+    return [{"id": i + 1, "amount": i * 2.0, "Remarks": "edited"} for i in range(count)]
+
+
+def save_per_row(items) -> None:
+    """The original path: one SELECT per edited id, then a single commit."""
+    db = SessionLocal()
+    try:
+        for item in items:
+            txn = db.query(UnifiedTransaction).filter(UnifiedTransaction.id == item["id"]).first()
+            txn.amount = float(item["amount"])
+            data = txn.data or {}
+            data.update({"Remarks": item["Remarks"]})
+            txn.data = data
+        db.commit()
+    finally:
+        db.close()
+
+
+def save_batched(items) -> None:
+    db = SessionLocal()
+    try:
+        TransactionService(db).save_unified_transactions(items)
+    finally:
+        db.close()
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for size in sizes:
+        items = edits(size)
+        seed(size)
+        per_row = common.measure(f"per-row save ({size:,})", lambda: save_per_row(items), size)
+        seed(size)
+        batched = common.measure(f"batched save ({size:,})", lambda: save_batched(items), size)
+        print(f"speedup: {per_row['seconds'] / batched['seconds']:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
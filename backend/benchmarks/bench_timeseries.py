@@ -0,0 +1,57 @@
+"""
+Time-series benchmark: a year of daily, weekly and monthly points served from
+the per-day rollup, against the same grouping over the raw transaction table.
+
+The rollup query's time should stay flat as `rows` grows; the raw scan's
+grows with the table.
+Run: python -m benchmarks.bench_timeseries [rows]
+"""
+import sys
+import timeit
+from datetime import date
+
+from benchmarks import common
+from sqlalchemy import func
+from app.db.database import SessionLocal
+from app.db.models import UnifiedTransaction
+from app.services.analytics_service import AnalyticsService
+from app.services.rollup_service import RollupService
+from app.services.upload_service import UploadService
+
+YEAR = (date(2025, 1, 1), date(2025, 12, 31))
+
+
+def raw_daily(db) -> list:
+    model = UnifiedTransaction
+    return (
+        db.query(model.txn_date, func.count(model.id), func.sum(model.amount))
+        .filter(model.txn_date.between(*YEAR))
+        .group_by(model.txn_date)
+        .all()
+    )
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = common.generate_csv(rows)
+    common.reset_db()
+    upload = common.open_upload(path)
+    db = SessionLocal()
+    try:
+        common.run_async(UploadService(db).process_unified_upload([upload]))
+        assert not RollupService(db).check("unified"), "rollups inconsistent after upload"
+
+        service = AnalyticsService(db)
+        for granularity in ("day", "week", "month"):
+            points = len(service.get_unified_time_series(granularity, *YEAR)["points"])
+            best = min(timeit.repeat(lambda: service.get_unified_time_series(granularity, *YEAR), number=5, repeat=3)) / 5
+            print(f"rollup {granularity:<6} {points:>4} points  {best * 1000:8.2f} ms")
+        best = min(timeit.repeat(lambda: raw_daily(db), number=1, repeat=3))
+        print(f"raw scan day    {rows:>10,} rows  {best * 1000:8.2f} ms")
+    finally:
+        db.close()
+        upload.file.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Shared helpers for the backend benchmarks.
+
+Benchmarks run against a throwaway SQLite database unless BENCH_DATABASE_URL
+is set (e.g. to a scratch PostgreSQL database). Import this module before
+anything from `app` so the engine picks up the benchmark database.
+
+Run from the backend directory, e.g.:
+    python -m benchmarks.bench_csv_ingest 1000000
+"""
+import asyncio
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+_workdir = tempfile.mkdtemp(prefix="fee_bench_")
+os.environ["DATABASE_URL"] = os.getenv(
+    "BENCH_DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+)
+
+from fastapi import UploadFile  # noqa: E402
+from app.db.database import Base, engine  # noqa: E402
+
+CSV_HEADER = [
+    "Transaction Date", "Transaction Time", "Amount", "Currency", "Payment Method",
+    "Transaction ID", "University Bank Name", "University Account Number",
+    "Payer Name", "Student ID/Roll Number", "Payer Email", "Fee Type",
+    "Academic Session", "Invoice/Challan Number", "Payment Status", "Remarks",
+]
+FEE_TYPES = ["Tuition Fees", "Hostel Fees", "Examination Fees", "Library Fees"]
+METHODS = ["Bank Transfer", "Online Payment Gateway", "Cash Deposit"]
+
+
+def workdir() -> str:
+    """Scratch directory for generated input files."""
+    return _workdir
+
+
+def reset_db() -> None:
+    """Drop and recreate all tables in the benchmark database."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def make_csv_row(i: int, rng: random.Random) -> list:
+    return [
+        f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+        str(rng.choice([5000, 15000, 25000, 100000])),
+        "PKR",
+        rng.choice(METHODS),
+        f"TX-{i:09d}",
+        "Bank of Pakistan",
+        f"GB{rng.randint(10**19, 10**20 - 1)}",
+        f"Payer {i % 5000}",
+        f"SP23-BSCS-{i % 1000:03d}",
+        f"payer{i % 5000}@example.com",
+        rng.choice(FEE_TYPES),
+        "Fall 2025",
+        f"INV-Fa25-{i:07d}",
+        "Paid",
+        "Deposited at branch",
+    ]
+
+
+def generate_csv(rows: int, name: str = "bench.csv", seed: int = 42) -> str:
+    """Write a bank-export style CSV with `rows` rows and return its path."""
+    path = os.path.join(_workdir, name)
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(CSV_HEADER)
+        for i in range(rows):
+            writer.writerow(make_csv_row(i, rng))
+    return path
+
+
+def generate_mt940(transactions: int, name: str = "bench.mt940", seed: int = 42) -> str:
+    """Write a single-statement MT940 file and return its path."""
+    path = os.path.join(_workdir, name)
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(":20:STMT0001\n:25:PK36SCBL0000001123456702\n:28C:00001/001\n")
+        fh.write(":60F:C250101PKR0,00\n")
+        for i in range(transactions):
+            mark = rng.choice("CD")
+            fh.write(f":61:2501{rng.randint(1, 28):02d}0101{mark}{rng.randint(1, 99999)},00NTRFREF{i}\n")
+            fh.write(f":86:Fee payment {i} from Payer {i % 5000}\n")
+            fh.write(f"Invoice INV-Fa25-{i:07d}\n")
+        fh.write(":62F:C250131PKR0,00\n")
+    return path
+
+
+def open_upload(path: str) -> UploadFile:
+    """Wrap a file on disk as a FastAPI UploadFile."""
+    return UploadFile(file=open(path, "rb"), filename=os.path.basename(path))
+
+
+def run_async(coro) -> Any:
+    return asyncio.run(coro)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def measure(label: str, fn: Callable[[], Any], rows: int) -> Dict[str, float]:
+    """Run `fn` once and print wall time, throughput and peak RSS."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    result = {
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(
+        f"{label:<32} {rows:>10,} rows  {elapsed:8.2f}s  "
+        f"{result['rows_per_sec']:>12,.0f} rows/s  peak RSS {result['peak_rss_mb']:8.1f} MB"
+    )
+    return result
@@ -0,0 +1,45 @@
+"""
+Script to verify the analytics rollup tables (overall and per day) against
+the transaction tables. Rebuilds each dataset's rollups from scratch and
+diffs them against the incrementally maintained rows.
+Run: python check_rollup.py [--fix]
+"""
+import sys
+from app.db.database import SessionLocal, engine
+from app.db.models import Base
+from app.services.rollup_service import DATASETS, RollupService
+
+def check_rollups(fix: bool = False) -> int:
+    """Print mismatches per dataset and return how many were found."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        service = RollupService(db)
+        total = 0
+        for dataset in DATASETS:
+            mismatches = service.check(dataset)
+            total += len(mismatches)
+            if not mismatches:
+                print(f"{dataset}: rollup consistent")
+                continue
+            print(f"{dataset}: {len(mismatches)} mismatching group(s)")
+            for m in mismatches:
+                day = f"day={m['day']} " if "day" in m else ""
+                print(f"  {day}type={m['type']!r} source_file={m['source_file']!r}")
+                print(f"    expected: {m['expected']}")
+                print(f"    actual:   {m['actual']}")
+            if fix:
+                service.rebuild(dataset)
+                db.commit()
+                print(f"{dataset}: rollup rebuilt")
+        return total
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] != "--fix"):
+        print("Usage: python check_rollup.py [--fix]")
+        sys.exit(1)
+    fix = len(sys.argv) == 2
+    mismatches = check_rollups(fix)
+    sys.exit(1 if mismatches and not fix else 0)
@@ -0,0 +1,11 @@
+"""
+Tests run against a throwaway SQLite database unless TEST_DATABASE_URL is
+set (e.g. to a scratch PostgreSQL database). The URL is set here, before
+anything imports `app.db.database`.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='fee_test_'), 'test.db')}"
+)
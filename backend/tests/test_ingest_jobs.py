@@ -0,0 +1,59 @@
+import io
+import os
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.db.models import IngestJob  # noqa: E402
+from app.services import ingest_jobs, parse_pool, upload_service  # noqa: E402
+from app.services.ingest_jobs import IngestJobService, recover_interrupted_jobs  # noqa: E402
+
+ROWS = 25
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_job_records_progress_across_batches(db, monkeypatch):
+    # Several batches, with a progress write after every one
+    monkeypatch.setattr(upload_service, "UPLOAD_BATCH_SIZE", 10)
+    monkeypatch.setattr(ingest_jobs, "PROGRESS_INTERVAL", 0.0)
+    lines = ["Transaction Date,Amount,Fee Type"]
+    lines += [f"2025-01-{i % 28 + 1:02d},{100 + i},Tuition Fees" for i in range(ROWS)]
+    path = parse_pool.spool_to_disk(io.BytesIO("\n".join(lines).encode()), ".csv")
+
+    job, future = IngestJobService(db).submit("unified", [(path, "fees.csv")])
+    result = future.result(timeout=60)
+
+    db.expire_all()
+    status = IngestJobService(db).get_job(job.id)
+    assert status["status"] == "succeeded", status["error"]
+    assert status["rows_processed"] == ROWS
+    assert result["totals"]["rows"] == ROWS
+    assert not ingest_jobs._live_progress
+
+
+def test_restart_fails_interrupted_jobs(db):
+    job = IngestJob(id="interrupted", dataset="unified", status="running", created_at=datetime(2020, 1, 1))
+    db.add(job)
+    db.commit()
+    path = parse_pool.spool_to_disk(io.BytesIO(b"Amount\n1\n"), ".csv")
+    os.utime(path, (0, 0))
+
+    assert recover_interrupted_jobs(db) >= 1
+
+    status = IngestJobService(db).get_job("interrupted")
+    assert status["status"] == "failed"
+    assert "restart" in status["error"]
+    assert not os.path.exists(path)
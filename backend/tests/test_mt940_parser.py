@@ -0,0 +1,42 @@
+import io
+
+from app.parsers.mt940_parser import parse_mt940
+from app.parsers.upload_parser import ParseRejects, iter_mt940_batches
+
+STATEMENT = """:20:STMT0001
+:25:PK36SCBL0000001123456702
+:28C:00001/001
+:60F:C230101PKR0,00
+{lines}
+:62F:C230131PKR100,00
+"""
+
+
+def test_customer_reference_with_single_slashes():
+    content = STATEMENT.format(lines=":61:2301010101C100,00NTRFINV/2023/01//BANKREF\n:86:Fee payment")
+    (txn,) = parse_mt940(content)
+    assert txn["type"] == "credit"
+    assert txn["amount"] == 100.0
+    assert txn["customer_reference"] == "INV/2023/01"
+    assert txn["bank_reference"] == "BANKREF"
+    assert txn["description"] == "Fee payment"
+
+
+def test_unparseable_statement_line_is_reported():
+    content = STATEMENT.format(lines=":61:not a statement line\n:61:2301020102D5,50NTRFREF1")
+    rejects = ParseRejects()
+    batches = list(iter_mt940_batches(io.BytesIO(content.encode()), "stmt.txt", 100, [], rejects))
+    rows = [norm for batch in batches for norm, _ in batch]
+    assert [row["amount"] for row in rows] == [5.5]
+    assert rejects.counts == {"stmt.txt": 1}
+    assert rejects.samples[0]["line"] == "not a statement line"
+
+
+def test_malformed_file_is_reported():
+    content = STATEMENT.format(lines=":61:2301010101C100,00NTRFREF1").encode() + b"\xff\xfe:61:"
+    rejects = ParseRejects()
+    batches = list(iter_mt940_batches(io.BytesIO(content), "stmt.txt", 100, [], rejects))
+    # The decode error surfaces with the first chunk, before any row
+    assert batches == []
+    assert rejects.errors[0]["source_file"] == "stmt.txt"
+    assert rejects.errors[0]["error"].startswith("parsing stopped after 0 transaction(s)")
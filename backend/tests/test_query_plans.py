@@ -0,0 +1,83 @@
+"""
+Checks that the common listing filters are served by their indexes.
+
+Runs EXPLAIN for each filter/sort combination of the transaction listings
+with sequential scans disabled and asserts that the filter column is an
+Index Cond of the expected index, not a plain Filter over some other scan.
+PostgreSQL only: skipped unless TEST_DATABASE_URL points at PostgreSQL.
+"""
+import re
+from datetime import date
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.migrations import upgrade_schema  # noqa: E402
+from app.db.models import Base  # noqa: E402
+from app.services.rollup_service import DATASETS  # noqa: E402
+from app.services.transaction_service import TransactionService  # noqa: E402
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="needs a PostgreSQL database")
+
+PAGE_SIZE = 20
+# (label, filters, sort, index name suffix, filter column)
+CASES = [
+    ("date range", {"date_from": date(2025, 1, 1), "date_to": date(2025, 1, 31)}, "date", "txn_date_id", "txn_date"),
+    ("date range, newest first", {"date_from": date(2025, 1, 1)}, "-date", "txn_date_id", "txn_date"),
+    (
+        "type + date range",
+        {"type": "Tuition Fees", "date_from": date(2025, 1, 1), "date_to": date(2025, 3, 31)},
+        "date",
+        "type_txn_date",
+        "type",
+    ),
+    ("type", {"type": "Tuition Fees"}, "id", "type_txn_date", "type"),
+    ("source file + date range", {"source_file": "bank.csv", "date_from": date(2025, 1, 1)}, "date", "source_file_txn_date", "source_file"),
+    ("amount range", {"amount_min": 1000.0, "amount_max": 50000.0}, "amount", "amount_id", "amount"),
+    ("student id", {"student_id": "SP23-BSCS-001"}, "id", "student_id", "student_id"),
+    ("invoice number", {"invoice_number": "INV-Fa25-0000001"}, "id", "invoice_number", "invoice_number"),
+]
+
+
+@pytest.fixture(scope="module")
+def db():
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    session = SessionLocal()
+    try:
+        session.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def index_conditions(plan, index):
+    """Index Cond / Recheck Cond lines of the plan nodes that scan `index`."""
+    conditions = []
+    node = re.compile(rf"\b(?:using|on) {re.escape(index)}\b")
+    for i, line in enumerate(plan):
+        if not node.search(line):
+            continue
+        for detail in plan[i + 1:]:
+            if "->" in detail:
+                break
+            if "Index Cond:" in detail or "Recheck Cond:" in detail:
+                conditions.append(detail.strip())
+    return conditions
+
+
+@pytest.mark.parametrize("dataset", list(DATASETS))
+@pytest.mark.parametrize("label, filters, sort, index, column", CASES, ids=[case[0] for case in CASES])
+def test_filter_uses_index(db, dataset, label, filters, sort, index, column):
+    model = DATASETS[dataset]
+    index = f"ix_{model.__tablename__}_{index}"
+    query = TransactionService(db).listing_query(model, filters, sort).limit(PAGE_SIZE + 1)
+    compiled = query.statement.compile(dialect=engine.dialect)
+    plan = [row[0] for row in db.connection().exec_driver_sql("EXPLAIN " + str(compiled), compiled.params)]
+
+    conditions = index_conditions(plan, index)
+    assert any(column in condition for condition in conditions), "\n".join(plan)